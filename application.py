@@ -1,20 +1,42 @@
 import asyncio
 import threading
+import uuid
 
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request
 
 from fastapi.exceptions import RequestValidationError
 from starlette.responses import JSONResponse
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
-from src.app.aws.handlers import process_sqs_messages
-from src.app.routers import analysis
+from src.app.aws.handlers import create_sqs_consumer, process_sqs_messages
+from src.app.jobs import get_job_manager
+from src.app.routers import analysis, health, metrics
 from src.app.aws.clients import sqs_client
+from src.app.services import (
+    get_process_pool_engine,
+    get_callback_dispatcher,
+    get_translator_service,
+    warm_up_services,
+)
+from src.settings.config import logger, settings
+from src.settings.log import set_correlation_id
 
 app = FastAPI()
 api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(analysis.router, prefix="/analysis", tags=["Analysis"])
 app.include_router(api_router)
+app.include_router(health.router, prefix="/health", tags=["Health"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+app.state.ready = False
+
+
+@app.middleware("http")
+async def correlation_id_middleware(request: Request, call_next):
+    request_id = request.headers.get("X-Correlation-ID") or uuid.uuid4().hex
+    set_correlation_id(request_id)
+    response = await call_next(request)
+    response.headers["X-Correlation-ID"] = request_id
+    return response
 
 
 @app.exception_handler(RequestValidationError)
@@ -26,8 +48,41 @@ async def validation_exception_handler(request, exc):
     )
 
 
+async def warm_up():
+    """Warms the services up in the background, then starts consuming SQS messages and reports ready."""
+
+    try:
+        await asyncio.to_thread(warm_up_services)
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}")
+        raise
+
+    if settings.SQS_EMBEDDED_CONSUMER:
+        app.state.sqs_consumer = create_sqs_consumer(sqs_client)
+        app.state.sqs_thread = threading.Thread(
+            target=asyncio.run, args=(process_sqs_messages(app.state.sqs_consumer),), daemon=True
+        )
+        app.state.sqs_thread.start()
+
+    app.state.ready = True
+
+
 @app.on_event("startup")
 async def startup_event():
-    thread = threading.Thread(target=asyncio.run, args=(process_sqs_messages(sqs_client),))
-    thread.daemon = True
-    thread.start()
+    app.state.warm_up_task = asyncio.create_task(warm_up())
+    app.state.outbox_replay_task = asyncio.create_task(get_callback_dispatcher().run_outbox_replay())
+    await get_job_manager().start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.ready = False
+    app.state.warm_up_task.cancel()
+    if getattr(app.state, "sqs_consumer", None) is not None:
+        app.state.sqs_consumer.stop()
+        await asyncio.to_thread(app.state.sqs_thread.join, settings.SQS_DRAIN_TIMEOUT + settings.SQS_WAIT_TIME_SECONDS)
+    app.state.outbox_replay_task.cancel()
+    await get_job_manager().stop()
+    await get_callback_dispatcher().aclose()
+    await get_translator_service().aclose()
+    await asyncio.to_thread(get_process_pool_engine().shutdown)
@@ -0,0 +1,89 @@
+"""Synthetic TXT, DOCX and PDF documents in several sizes and languages."""
+
+import random
+from io import BytesIO
+from typing import Dict, List
+
+import fitz
+from docx import Document
+
+SIZES = {"small": 2 * 1024, "medium": 64 * 1024, "large": 1024 * 1024}
+FILE_TYPES = ("txt", "docx", "pdf")
+
+VOCABULARY = {
+    "en": (
+        "the service was good and the staff were friendly but the room was small and noisy "
+        "I really love this product it is great value although delivery was slow and the box was damaged "
+        "overall a terrible experience we will never come back the food was cold and bland"
+    ),
+    "es": (
+        "el servicio fue bueno y el personal amable pero la habitación era pequeña y ruidosa "
+        "me encanta este producto es una gran compra aunque el envío fue lento y la caja llegó dañada "
+        "en general una experiencia terrible nunca volveremos la comida estaba fría y sin sabor"
+    ),
+    "de": (
+        "der service war gut und das personal freundlich aber das zimmer war klein und laut "
+        "ich liebe dieses produkt es ist sehr preiswert obwohl die lieferung langsam war "
+        "insgesamt eine schreckliche erfahrung wir kommen nie wieder das essen war kalt und fade"
+    ),
+}
+
+
+def generate_text(language: str, size: int, rng: random.Random) -> str:
+    """Builds sentences of random words from the language vocabulary until the text reaches `size` characters."""
+
+    words = VOCABULARY[language].split()
+    sentences: List[str] = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(6, 18))).capitalize() + rng.choice(".!?")
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def paragraphs(text: str, sentences_per_paragraph: int = 8) -> List[str]:
+    sentences = text.replace("! ", "!\n").replace("? ", "?\n").replace(". ", ".\n").split("\n")
+    return [
+        " ".join(sentences[start : start + sentences_per_paragraph])
+        for start in range(0, len(sentences), sentences_per_paragraph)
+    ]
+
+
+def render(file_type: str, text: str) -> bytes:
+    if file_type == "txt":
+        return text.encode("utf-8")
+
+    if file_type == "docx":
+        document = Document()
+        for paragraph in paragraphs(text):
+            document.add_paragraph(paragraph)
+        buffer = BytesIO()
+        document.save(buffer)
+        return buffer.getvalue()
+
+    with fitz.open() as document:
+        for paragraph in paragraphs(text, sentences_per_paragraph=40):
+            page = document.new_page()
+            page.insert_textbox(fitz.Rect(50, 50, 545, 792), paragraph, fontsize=8)
+        return document.tobytes()
+
+
+def build_corpus(
+    sizes: List[str], languages: List[str], file_types: List[str], copies: int, seed: int
+) -> Dict[str, bytes]:
+    """
+    Generates `copies` distinct documents for every size, language and file type.
+
+    :return: A mapping of object keys (e.g. `medium/es/3.pdf`) to file contents.
+    """
+
+    rng = random.Random(seed)
+    corpus = {}
+    for size in sizes:
+        for language in languages:
+            for copy in range(copies):
+                text = generate_text(language, SIZES[size], rng)
+                for file_type in file_types:
+                    corpus[f"{size}/{language}/{copy}.{file_type}"] = render(file_type, text)
+    return corpus
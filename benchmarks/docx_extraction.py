@@ -0,0 +1,128 @@
+"""
+Checks that the streaming DOCX reader matches `python-docx` and compares their speed.
+
+Usage: python -m benchmarks.docx_extraction [--docs 200] [--paragraphs 400] [--seed 3]
+
+The reference walks the `python-docx` object model: body paragraphs and the paragraphs of every table cell,
+in document order (`Document.paragraphs` alone skips tables). Documents without tables must match the old extractor,
+which joined `Document.paragraphs` only.
+"""
+
+import argparse
+import random
+import sys
+import time
+from io import BytesIO
+from typing import Iterator, List
+
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import OxmlElement
+from docx.table import _Cell
+from docx.text.paragraph import Paragraph
+
+from benchmarks.corpus import VOCABULARY
+from src.app.services.docx_reader import iter_docx_paragraphs
+
+WORDS = VOCABULARY["en"].split() + ["naïve", "café", "“quoted”", "  ", "x y"]
+
+
+def add_hyperlink(paragraph: Paragraph, text: str) -> None:
+    hyperlink = OxmlElement("w:hyperlink")
+    run = OxmlElement("w:r")
+    text_element = OxmlElement("w:t")
+    text_element.text = text
+    run.append(text_element)
+    hyperlink.append(run)
+    paragraph._p.append(hyperlink)
+
+
+def fill_paragraph(paragraph: Paragraph, rng: random.Random) -> None:
+    for _ in range(rng.randint(0, 6)):
+        kind = rng.random()
+        if kind < 0.1:
+            add_hyperlink(paragraph, rng.choice(WORDS))
+            continue
+
+        run = paragraph.add_run(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))) + " ")
+        if kind < 0.2:
+            run.add_tab()
+        elif kind < 0.25:
+            run.add_break()
+        elif kind < 0.3:
+            run.add_break(rng.choice([WD_BREAK.PAGE, WD_BREAK.COLUMN]))
+        elif kind < 0.35:
+            run._r.append(OxmlElement("w:noBreakHyphen"))
+
+
+def build_document(rng: random.Random, paragraphs: int, tables: bool) -> bytes:
+    document = Document()
+    for _ in range(paragraphs):
+        if tables and rng.random() < 0.05:
+            table = document.add_table(rows=rng.randint(1, 4), cols=rng.randint(1, 4))
+            for cell in table._cells:
+                fill_paragraph(cell.paragraphs[0], rng)
+                if rng.random() < 0.2:
+                    fill_paragraph(cell.add_paragraph(), rng)
+            if rng.random() < 0.3:
+                table.cell(0, 0).merge(table.cell(0, len(table.columns) - 1))
+        else:
+            fill_paragraph(document.add_paragraph(), rng)
+
+    document.sections[0].header.paragraphs[0].text = "Header text"
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def iter_reference_paragraphs(container) -> Iterator[str]:
+    for block in container.iter_inner_content():
+        if isinstance(block, Paragraph):
+            if block.text.strip():
+                yield block.text
+            continue
+        for tr in block._tbl.tr_lst:
+            for tc in tr.tc_lst:
+                yield from iter_reference_paragraphs(_Cell(tc, block))
+
+
+def old_extractor(data: bytes) -> str:
+    document = Document(BytesIO(data))
+    return " ".join([paragraph.text for paragraph in document.paragraphs if paragraph.text.strip()])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents: List[bytes] = [build_document(rng, args.paragraphs, tables=index % 2 == 0) for index in range(args.docs)]
+
+    started = time.perf_counter()
+    expected = [" ".join(iter_reference_paragraphs(Document(BytesIO(data)))) for data in documents]
+    reference_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = [" ".join(iter_docx_paragraphs(data)) for data in documents]
+    streaming_seconds = time.perf_counter() - started
+
+    mismatches = sum(1 for left, right in zip(expected, actual) if left != right)
+    old_mismatches = sum(
+        1 for index, data in enumerate(documents) if index % 2 == 1 and old_extractor(data) != actual[index]
+    )
+    headers = sum(1 for data in documents if "Header text" in " ".join(iter_docx_paragraphs(data, True)))
+
+    print(f"Documents: {len(documents)}, {sum(map(len, documents)) / len(documents) / 1024:.0f} KB on average")
+    print(f"Mismatches with python-docx (paragraphs and tables): {mismatches}")
+    print(f"Mismatches with the old extractor (documents without tables): {old_mismatches}")
+    print(f"Documents with the header read when enabled: {headers}")
+    print(f"python-docx: {reference_seconds:.2f}s, streaming: {streaming_seconds:.2f}s")
+    print(f"Speedup: {reference_seconds / streaming_seconds:.1f}x")
+    return 1 if mismatches or old_mismatches or headers != len(documents) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Checks that the lexicon sentiment engine matches TextBlob and compares their speed.
+
+Usage: python -m benchmarks.lexicon_scorer [--docs 5000] [--seed 2]
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import List
+
+from textblob import TextBlob
+
+from src.app.services.lexicon_scorer import LexiconSentimentScorer
+
+FILLER_WORDS = ["the", "a", "is", "of", "and", "not", "very", "really", "no", "never", "cat", "dog", "it's"]
+EDGE_CASE_WORDS = ["don't", "isn't", "can't", "e.g.", "Mr.", "U.S.", "3.5", "well-known"]
+PREFIXES = ["", "", "", "", "(", '"', "'", "“"]
+SUFFIXES = ["", "", "", "", ",", ".", "!", "?", "...", ";", ":", ")", "!!", '"', "'"]
+
+
+def build_corpus(words: List[str], docs: int, seed: int) -> List[str]:
+    """
+    Builds random documents from lexicon words, fillers, punctuation, emoticons and sarcasm marks.
+
+    :param words: Lexicon words to sample from.
+    :param docs: Number of documents.
+    :param seed: Random seed.
+    :return: A list of documents.
+    """
+
+    rng = random.Random(seed)
+    vocabulary = words + FILLER_WORDS + EDGE_CASE_WORDS
+    corpus = []
+    for _ in range(docs):
+        tokens = []
+        for _ in range(rng.randint(1, 40)):
+            word = rng.choice(vocabulary)
+            word = word.capitalize() if rng.random() < 0.5 else word
+            tokens.append(rng.choice(PREFIXES) + word + rng.choice(SUFFIXES))
+        if rng.random() < 0.1:
+            tokens.append(":)")
+        if rng.random() < 0.1:
+            tokens.append("(!) great")
+        corpus.append(" ".join(tokens))
+    return corpus
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=2)
+    args = parser.parse_args()
+
+    scorer = LexiconSentimentScorer()
+    corpus = build_corpus([word for word in scorer._word_ids if " " not in word], args.docs, args.seed)
+
+    started = time.perf_counter()
+    expected = [TextBlob(text).sentiment for text in corpus]
+    textblob_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = scorer.score_batch(corpus)
+    lexicon_time = time.perf_counter() - started
+
+    mismatches = 0
+    for text, sentiment, (polarity, subjectivity) in zip(corpus, expected, actual):
+        if abs(sentiment.polarity - polarity) > 1e-9 or abs(sentiment.subjectivity - subjectivity) > 1e-9:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"mismatch: {text!r} textblob={tuple(sentiment)} lexicon={(polarity, subjectivity)}")
+
+    print(f"documents: {len(corpus)}, mismatches: {mismatches}")
+    print(f"textblob: {textblob_time:.3f}s, lexicon: {lexicon_time:.3f}s, speedup: {textblob_time / lexicon_time:.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
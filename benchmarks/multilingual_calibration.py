@@ -0,0 +1,176 @@
+"""
+Compares native multilingual scoring with translate-then-score on a shared parallel corpus.
+
+Usage: python -m benchmarks.multilingual_calibration [--lexicons DIR] [--corpus corpus.jsonl] [--translate]
+                                                     [--min-agreement 0.7]
+
+Every document is scored twice: natively, with the lexicon of its language from `--lexicons` (default
+`SENTIMENT_LEXICON_DIR`), and in English, by the configured `SENTIMENT_ENGINE`. The English side is the reference
+translation of the corpus, or the output of `TRANSLATION_BACKEND` with `--translate`. The corpus is a JSON Lines file
+of `{"language": "fr", "text": "...", "reference": "..."}` objects; a small built-in parallel corpus is used without
+`--corpus`. Languages without a lexicon are listed but not compared.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from src.app.models.analysis_statuses import POLARITY_RANGES, SUBJECTIVITY_RANGES
+from src.app.services import get_language_detector, get_translator_service
+from src.app.services.analysis import _status_for, score_sentiment
+from src.app.services.multilingual import MultilingualSentimentScorer, find_lexicons
+from src.settings.config import settings
+
+REFERENCES = [
+    "The hotel was wonderful and the staff were very friendly.",
+    "The food was terrible and the service was slow.",
+    "This is a good product, but the price is too high.",
+    "I am very happy with the result.",
+    "The meeting is scheduled for Monday at ten.",
+    "The film was boring and far too long.",
+    "It is not a bad idea.",
+    "The new design is beautiful and practical.",
+]
+TRANSLATIONS = {
+    "de": [
+        "Das Hotel war wunderbar und das Personal sehr freundlich.",
+        "Das Essen war schrecklich und der Service war langsam.",
+        "Das ist ein gutes Produkt, aber der Preis ist zu hoch.",
+        "Ich bin mit dem Ergebnis sehr zufrieden.",
+        "Das Treffen ist für Montag um zehn Uhr geplant.",
+        "Der Film war langweilig und viel zu lang.",
+        "Das ist keine schlechte Idee.",
+        "Das neue Design ist schön und praktisch.",
+    ],
+    "es": [
+        "El hotel era maravilloso y el personal muy amable.",
+        "La comida era terrible y el servicio era lento.",
+        "Es un buen producto, pero el precio es demasiado alto.",
+        "Estoy muy contento con el resultado.",
+        "La reunión está prevista para el lunes a las diez.",
+        "La película era aburrida y demasiado larga.",
+        "No es una mala idea.",
+        "El nuevo diseño es bonito y práctico.",
+    ],
+    "fr": [
+        "L'hôtel était merveilleux et le personnel très aimable.",
+        "La nourriture était terrible et le service était lent.",
+        "C'est un bon produit, mais le prix est trop élevé.",
+        "Je suis très content du résultat.",
+        "La réunion est prévue lundi à dix heures.",
+        "Le film était ennuyeux et beaucoup trop long.",
+        "Ce n'est pas une mauvaise idée.",
+        "Le nouveau design est beau et pratique.",
+    ],
+    "it": [
+        "L'albergo era meraviglioso e il personale molto gentile.",
+        "Il cibo era terribile e il servizio era lento.",
+        "È un buon prodotto, ma il prezzo è troppo alto.",
+        "Sono molto contento del risultato.",
+        "La riunione è prevista per lunedì alle dieci.",
+        "Il film era noioso e decisamente troppo lungo.",
+        "Non è una cattiva idea.",
+        "Il nuovo design è bello e pratico.",
+    ],
+    "nl": [
+        "Het hotel was geweldig en het personeel erg vriendelijk.",
+        "Het eten was verschrikkelijk en de bediening was traag.",
+        "Het is een goed product, maar de prijs is te hoog.",
+        "Ik ben erg blij met het resultaat.",
+        "De vergadering is gepland op maandag om tien uur.",
+        "De film was saai en veel te lang.",
+        "Het is geen slecht idee.",
+        "Het nieuwe ontwerp is mooi en praktisch.",
+    ],
+    "pt": [
+        "O hotel era maravilhoso e os funcionários muito simpáticos.",
+        "A comida era terrível e o serviço era lento.",
+        "É um bom produto, mas o preço é alto demais.",
+        "Estou muito contente com o resultado.",
+        "A reunião está marcada para segunda-feira às dez.",
+        "O filme era chato e longo demais.",
+        "Não é uma má ideia.",
+        "O novo design é bonito e prático.",
+    ],
+}
+
+
+def load_corpus(path: Optional[str]) -> List[Dict[str, str]]:
+    if path is None:
+        return [
+            {"language": language, "text": text, "reference": reference}
+            for language, texts in TRANSLATIONS.items()
+            for text, reference in zip(texts, REFERENCES)
+        ]
+
+    with open(path, encoding="utf-8") as corpus_file:
+        return [json.loads(line) for line in corpus_file if line.strip()]
+
+
+def sign(value: float) -> int:
+    return (value > 0) - (value < 0)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lexicons", default=settings.SENTIMENT_LEXICON_DIR)
+    parser.add_argument("--corpus")
+    parser.add_argument("--translate", action="store_true", help="translate with TRANSLATION_BACKEND")
+    parser.add_argument("--min-agreement", type=float, default=0.7, help="polarity status agreement to pass")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if args.translate or any(not document.get("reference") for document in corpus):
+        translations = asyncio.run(get_translator_service().translate_many([document["text"] for document in corpus]))
+        for document, translation in zip(corpus, translations):
+            if args.translate or not document.get("reference"):
+                document["reference"] = translation or document["text"]
+
+    scorer = MultilingualSentimentScorer(find_lexicons(args.lexicons))
+    detector = get_language_detector()
+    by_language = defaultdict(list)
+    for document in corpus:
+        by_language[document["language"]].append(document)
+
+    failed = []
+    print(f"{'lang':<6}{'docs':>6}{'detected':>10}{'|dP|':>8}{'|dS|':>8}{'status':>8}{'subj':>8}{'sign':>8}")
+    for language, documents in sorted(by_language.items()):
+        detected = sum(1 for document in documents if detector.language(document["text"]) == language)
+        if language not in scorer.lexicons:
+            print(f"{language:<6}{len(documents):>6}{detected / len(documents):>10.0%}   no lexicon, translated")
+            continue
+
+        native = [scorer.score(document["text"], language) for document in documents]
+        translated = [score_sentiment(document["reference"]) for document in documents]
+        pairs = list(zip(native, translated))
+        polarity_error = sum(abs(left[0] - right[0]) for left, right in pairs) / len(pairs)
+        subjectivity_error = sum(abs(left[1] - right[1]) for left, right in pairs) / len(pairs)
+        status_agreement = sum(
+            _status_for(left[0], POLARITY_RANGES) == _status_for(right[0], POLARITY_RANGES) for left, right in pairs
+        ) / len(pairs)
+        subjectivity_agreement = sum(
+            _status_for(left[1], SUBJECTIVITY_RANGES) == _status_for(right[1], SUBJECTIVITY_RANGES)
+            for left, right in pairs
+        ) / len(pairs)
+        sign_agreement = sum(sign(left[0]) == sign(right[0]) for left, right in pairs) / len(pairs)
+        print(
+            f"{language:<6}{len(documents):>6}{detected / len(documents):>10.0%}{polarity_error:>8.3f}"
+            f"{subjectivity_error:>8.3f}{status_agreement:>8.0%}{subjectivity_agreement:>8.0%}{sign_agreement:>8.0%}"
+        )
+        if status_agreement < args.min_agreement:
+            failed.append(language)
+
+    if not scorer.lexicons:
+        print(f"No lexicons in {args.lexicons!r}, nothing was compared")
+        return 1
+    if failed:
+        print(f"Polarity status agreement below {args.min_agreement:.0%}: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+End-to-end benchmark of the analysis pipeline that runs offline.
+
+Usage: python -m benchmarks.pipeline [--scenarios handler,route,upload,sqs] [--sizes small,medium] [--languages en,es]
+                                     [--file-types txt,docx,pdf] [--copies 3] [--concurrency 8]
+                                     [--output baseline.json] [--compare previous.json]
+
+Synthetic documents are served by the in-memory storage backend and run through `text_tonality_analysis_handler`,
+the `/api/v1/analysis/tonality` route, the `/api/v1/analysis/tonality/upload` route and `process_sqs_messages`
+(fed by a local SQS stand-in). Translation uses the `local` backend and callbacks go to a local HTTP receiver. The result cache is disabled so every document
+is processed. The report (throughput, p50/p95/p99 latency, peak RSS and a per-stage breakdown) is printed and
+optionally written as JSON, and can be compared with a previous report.
+"""
+
+import os
+
+BENCHMARK_ENVIRONMENT = {
+    "STORAGE_BACKEND": "memory",
+    "TRANSLATION_BACKEND": "local",
+    "RESULT_CACHE_ENABLED": "False",
+    "CALLBACK_OUTBOX_PATH": "",
+    "RESULT_STORE_PATH": "",
+    "CALLBACK_MAX_RETRIES": "0",
+    "SQS_DEDUPE_BACKEND": "memory",
+    "SQS_EMBEDDED_CONSUMER": "False",
+    "LOG_LEVEL": "WARNING",
+}
+for name, value in BENCHMARK_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import platform  # noqa: E402
+import resource  # noqa: E402
+import statistics  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+from typing import Callable, Dict, List  # noqa: E402
+
+import httpx  # noqa: E402
+
+from benchmarks.corpus import FILE_TYPES, SIZES, VOCABULARY, build_corpus  # noqa: E402
+from benchmarks.standins import CallbackReceiver, LocalSQSClient  # noqa: E402
+
+SCENARIOS = ("handler", "route", "upload", "sqs")
+COMPARED_METRICS = ("throughput_per_second", "p50_ms", "p95_ms", "p99_ms")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size of this process and of its live children (the process pool workers)."""
+
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = 0.0
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as status_file:
+                status = dict(line.split(":", 1) for line in status_file if ":" in line)
+        except OSError:
+            continue
+        if status.get("PPid", "").strip() == str(os.getpid()) and "VmHWM" in status:
+            children += int(status["VmHWM"].split()[0]) / 1024
+    return {"main": round(own, 1), "workers": round(children, 1)}
+
+
+def stage_totals() -> Dict[str, List[float]]:
+    """Returns the cumulative (count, seconds) of every pipeline stage recorded so far."""
+
+    from src.app.metrics import STAGE_DURATION
+
+    totals: Dict[str, List[float]] = {}
+    for metric in STAGE_DURATION.collect():
+        for sample in metric.samples:
+            stage_total = totals.setdefault(sample.labels["stage"], [0.0, 0.0])
+            if sample.name.endswith("_count"):
+                stage_total[0] += sample.value
+            elif sample.name.endswith("_sum"):
+                stage_total[1] += sample.value
+    return totals
+
+
+def stage_breakdown(before: Dict[str, List[float]], after: Dict[str, List[float]]) -> Dict[str, Dict]:
+    breakdown = {}
+    for stage, (count, seconds) in sorted(after.items()):
+        count -= before.get(stage, [0.0, 0.0])[0]
+        seconds -= before.get(stage, [0.0, 0.0])[1]
+        if count:
+            breakdown[stage] = {
+                "count": int(count),
+                "total_seconds": round(seconds, 4),
+                "mean_ms": round(seconds / count * 1000, 3),
+            }
+    return breakdown
+
+
+async def run_handler_scenario(corpus: Dict[str, bytes], concurrency: int, callback_url: str) -> List[float]:
+    from src.app.handlers import text_tonality_analysis_handler
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def analyse(key: str) -> float:
+        async with semaphore:
+            started = time.perf_counter()
+            _, status = await text_tonality_analysis_handler(key)
+            if status != "success":
+                raise RuntimeError(f"{key} finished with status {status}")
+            return time.perf_counter() - started
+
+    return list(await asyncio.gather(*(analyse(key) for key in sorted(corpus))))
+
+
+async def run_route_scenario(corpus: Dict[str, bytes], concurrency: int, callback_url: str) -> List[float]:
+    from application import app
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+
+        async def request(key: str) -> float:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/analysis/tonality", json={"s3_key": key, "callback_url": callback_url}
+                )
+                if response.status_code != 201:
+                    raise RuntimeError(f"{key} returned {response.status_code}: {response.text}")
+                return time.perf_counter() - started
+
+        return list(await asyncio.gather(*(request(key) for key in sorted(corpus))))
+
+
+async def run_upload_scenario(corpus: Dict[str, bytes], concurrency: int, callback_url: str) -> List[float]:
+    from application import app
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+
+        async def request(key: str) -> float:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/analysis/tonality/upload", files={"file": (key.replace("/", "-"), corpus[key])}
+                )
+                if response.status_code != 200:
+                    raise RuntimeError(f"{key} returned {response.status_code}: {response.text}")
+                return time.perf_counter() - started
+
+        return list(await asyncio.gather(*(request(key) for key in sorted(corpus))))
+
+
+async def run_sqs_scenario(corpus: Dict[str, bytes], concurrency: int, callback_url: str) -> List[float]:
+    from src.app.aws.handlers import create_sqs_consumer, process_sqs_messages
+
+    sqs_client = LocalSQSClient([{"s3_key": key, "callback_url": callback_url} for key in sorted(corpus)])
+    consumer = create_sqs_consumer(sqs_client, max_in_flight=concurrency)
+    consumer_task = asyncio.create_task(process_sqs_messages(consumer))
+    await asyncio.to_thread(sqs_client.all_deleted.wait)
+    consumer.stop()
+    await consumer_task
+    return sqs_client.latencies()
+
+
+SCENARIO_RUNNERS: Dict[str, Callable] = {
+    "handler": run_handler_scenario,
+    "route": run_route_scenario,
+    "upload": run_upload_scenario,
+    "sqs": run_sqs_scenario,
+}
+
+
+async def run_benchmark(args: argparse.Namespace, corpus: Dict[str, bytes]) -> Dict:
+    from src.app.services import get_process_pool_engine, get_storage, warm_up_services
+
+    for key, data in corpus.items():
+        get_storage().memory.put(key, data)
+    await asyncio.to_thread(warm_up_services)
+    report = {}
+    try:
+        with CallbackReceiver() as receiver:
+            for scenario in args.scenarios:
+                before = stage_totals()
+                started = time.perf_counter()
+                latencies = await SCENARIO_RUNNERS[scenario](corpus, args.concurrency, receiver.url)
+                elapsed = time.perf_counter() - started
+                report[scenario] = {
+                    "documents": len(latencies),
+                    "seconds": round(elapsed, 3),
+                    "throughput_per_second": round(len(latencies) / elapsed, 3),
+                    "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+                    "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+                    "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+                    "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+                    "peak_rss_mb": peak_rss_mb(),
+                    "stages": stage_breakdown(before, stage_totals()),
+                }
+    finally:
+        await asyncio.to_thread(get_process_pool_engine().shutdown)
+
+    return report
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report: Dict, baseline: Dict) -> None:
+    print(f"\nCompared with {baseline['meta'].get('revision', 'unknown')}:")
+    for scenario, results in report["scenarios"].items():
+        previous = baseline["scenarios"].get(scenario)
+        if previous is None:
+            continue
+        changes = []
+        for metric in COMPARED_METRICS:
+            if previous.get(metric):
+                change = (results[metric] - previous[metric]) / previous[metric] * 100
+                changes.append(f"{metric} {change:+.1f}%")
+        print(f"  {scenario}: {', '.join(changes)}")
+
+
+def parse_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--scenarios", type=parse_list, default=list(SCENARIOS))
+    parser.add_argument("--sizes", type=parse_list, default=["small", "medium"])
+    parser.add_argument("--languages", type=parse_list, default=["en", "es"])
+    parser.add_argument("--file-types", type=parse_list, default=list(FILE_TYPES))
+    parser.add_argument("--copies", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--compare", help="Compare with a report written by a previous run")
+    args = parser.parse_args()
+
+    for name, values, known in (
+        ("scenario", args.scenarios, SCENARIOS),
+        ("size", args.sizes, SIZES),
+        ("language", args.languages, VOCABULARY),
+        ("file type", args.file_types, FILE_TYPES),
+    ):
+        unknown = set(values) - set(known)
+        if unknown:
+            parser.error(f"Unknown {name}: {', '.join(sorted(unknown))}")
+
+    corpus = build_corpus(args.sizes, args.languages, args.file_types, args.copies, args.seed)
+    scenarios = asyncio.run(run_benchmark(args, corpus))
+
+    from src.settings.config import settings
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "process_pool_workers": settings.PROCESS_POOL_WORKERS,
+            "sentiment_engine": settings.SENTIMENT_ENGINE,
+            "corpus": {
+                "documents": len(corpus),
+                "bytes": sum(len(data) for data in corpus.values()),
+                "sizes": args.sizes,
+                "languages": args.languages,
+                "file_types": args.file_types,
+                "copies": args.copies,
+                "seed": args.seed,
+            },
+            "concurrency": args.concurrency,
+        },
+        "scenarios": scenarios,
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(report, json.load(baseline_file))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Offline stand-ins for SQS and the callback receiver."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+
+class LocalSQSClient:
+    """
+    An in-memory queue with the receive, delete and visibility calls used by `SQSConsumer`.
+    Records when each message was received and deleted, so per-message latency can be computed.
+    """
+
+    def __init__(self, bodies: List[Dict]):
+        now = str(int(time.time() * 1000))
+        self._lock = threading.Lock()
+        self._visible = [
+            {
+                "MessageId": str(index),
+                "ReceiptHandle": f"receipt-{index}",
+                "Body": json.dumps(body),
+                "Attributes": {"SentTimestamp": now},
+            }
+            for index, body in enumerate(bodies)
+        ]
+        self.total = len(bodies)
+        self.received_at: Dict[str, float] = {}
+        self.deleted_at: Dict[str, float] = {}
+        self.all_deleted = threading.Event()
+
+    def receive_message(self, MaxNumberOfMessages: int = 1, WaitTimeSeconds: int = 0, **kwargs) -> Dict:
+        with self._lock:
+            messages, self._visible = self._visible[:MaxNumberOfMessages], self._visible[MaxNumberOfMessages:]
+            for message in messages:
+                self.received_at.setdefault(message["ReceiptHandle"], time.perf_counter())
+        if not messages and WaitTimeSeconds:
+            time.sleep(0.05)
+        return {"Messages": messages}
+
+    def delete_message_batch(self, Entries: List[Dict], **kwargs) -> Dict:
+        with self._lock:
+            for entry in Entries:
+                self.deleted_at.setdefault(entry["ReceiptHandle"], time.perf_counter())
+            if len(self.deleted_at) >= self.total:
+                self.all_deleted.set()
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+    def change_message_visibility(self, **kwargs) -> Dict:
+        return {}
+
+    def latencies(self) -> List[float]:
+        return [self.deleted_at[handle] - self.received_at[handle] for handle in self.deleted_at]
+
+
+class CallbackReceiver:
+    """A local HTTP server that accepts callback POSTs and counts them."""
+
+    def __init__(self):
+        receiver = self
+        self.received = 0
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with receiver._lock:
+                    receiver.received += 1
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                return None
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/callback"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "CallbackReceiver":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,4 +1,6 @@
 import boto3
+from botocore.config import Config
+
 from src.settings.config import settings
 
 s3_client = boto3.client(
@@ -6,6 +8,7 @@ s3_client = boto3.client(
     aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
     aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
     region_name=settings.AWS_S3_REGION,
+    config=Config(max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS, tcp_keepalive=True),
 )
 
 sqs_client = boto3.client(
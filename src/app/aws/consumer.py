@@ -0,0 +1,279 @@
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from src.app.aws.dedupe import dedupe_key, get_dedupe_store
+from src.app.metrics import SQS_MESSAGE_LAG
+from src.settings.config import settings, logger
+from src.settings.log import set_correlation_id
+
+SQS_MAX_MESSAGES_PER_RECEIVE = 10
+SQS_EMPTY_POLL_DELAY = 0.5
+SQS_ERROR_POLL_DELAY = 1.0
+
+MessageHandler = Callable[[str, str], Awaitable[None]]
+
+
+class SQSDeleteBatcher:
+    """Coalesces message acknowledgements into `delete_message_batch` calls."""
+
+    def __init__(self, sqs_client, queue_url: str, batch_size: int, flush_interval: float):
+        self.sqs_client = sqs_client
+        self.queue_url = queue_url
+        self.batch_size = min(batch_size, SQS_MAX_MESSAGES_PER_RECEIVE)
+        self.flush_interval = flush_interval
+        self._pending: asyncio.Queue = asyncio.Queue()
+
+    async def acknowledge(self, receipt_handle: str) -> None:
+        await self._pending.put(receipt_handle)
+
+    async def close(self) -> None:
+        """Asks `run` to flush everything acknowledged so far and return."""
+
+        await self._pending.put(None)
+
+    async def run(self) -> None:
+        """
+        Collects receipt handles until the batch is full or the flush interval expires, then deletes them at once.
+        Pending handles are flushed on `close` and when the task is cancelled.
+        """
+
+        batch: List[str] = []
+        closing = False
+        try:
+            while not closing:
+                receipt_handle = await self._pending.get()
+                if receipt_handle is None:
+                    closing = True
+                else:
+                    batch.append(receipt_handle)
+
+                deadline = asyncio.get_running_loop().time() + self.flush_interval
+                while not closing and len(batch) < self.batch_size:
+                    timeout = deadline - asyncio.get_running_loop().time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        receipt_handle = await asyncio.wait_for(self._pending.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if receipt_handle is None:
+                        closing = True
+                    else:
+                        batch.append(receipt_handle)
+
+                await self._delete_batch(batch)
+                batch = []
+        except asyncio.CancelledError:
+            while not self._pending.empty():
+                receipt_handle = self._pending.get_nowait()
+                if receipt_handle is not None:
+                    batch.append(receipt_handle)
+            for start in range(0, len(batch), self.batch_size):
+                await self._delete_batch(batch[start : start + self.batch_size])
+            raise
+
+    async def _delete_batch(self, receipt_handles: List[str]) -> None:
+        if not receipt_handles:
+            return
+
+        entries = [{"Id": str(index), "ReceiptHandle": handle} for index, handle in enumerate(receipt_handles)]
+        try:
+            response = await asyncio.to_thread(
+                self.sqs_client.delete_message_batch, QueueUrl=self.queue_url, Entries=entries
+            )
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"SQSDeleteBatcher: Failed to delete {len(entries)} messages: {str(e)}")
+            return
+
+        for failed in response.get("Failed", []):
+            logger.error(f"SQSDeleteBatcher: Failed to delete message {failed['Id']}: {failed.get('Message')}")
+
+
+class SQSConsumer:
+    """
+    Keeps up to `max_in_flight` messages processing at all times.
+    A new poll is issued as soon as a slot is free, so receiving overlaps with processing.
+    """
+
+    def __init__(
+        self, sqs_client, handler: MessageHandler, queue_url: str = None, max_in_flight: int = None, dedupe_store=None
+    ):
+        self.sqs_client = sqs_client
+        self.handler = handler
+        self.queue_url = queue_url or settings.AWS_SQS_QUEUE_URL
+        self.max_in_flight = max_in_flight or settings.SQS_MAX_IN_FLIGHT
+        self.dedupe_store = dedupe_store or get_dedupe_store()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_progress: Set[str] = set()
+        self._stopping = asyncio.Event()
+        self._stop_requested = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._delete_batcher = SQSDeleteBatcher(
+            sqs_client,
+            self.queue_url,
+            batch_size=settings.SQS_DELETE_BATCH_SIZE,
+            flush_interval=settings.SQS_DELETE_FLUSH_INTERVAL,
+        )
+
+    async def run(self) -> None:
+        """
+        Processes messages until `stop` is called. Messages in flight are then finished (up to `SQS_DRAIN_TIMEOUT`),
+        and messages received but not started are released back to the queue.
+        """
+
+        self._loop = asyncio.get_running_loop()
+        if self._stop_requested:
+            self._stopping.set()
+
+        delete_task = asyncio.create_task(self._delete_batcher.run())
+        stop_task = asyncio.create_task(self._stopping.wait())
+        try:
+            while not self._stopping.is_set():
+                reserve_task = asyncio.create_task(self._reserve_slots())
+                await asyncio.wait({reserve_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+                if not reserve_task.done():
+                    reserve_task.cancel()
+                    break
+
+                reserved = reserve_task.result()
+                messages = await self._receive_messages(reserved)
+                for _ in range(reserved - len(messages)):
+                    self._slots.release()
+
+                if self._stopping.is_set():
+                    await asyncio.gather(*(self._release_message(message) for message in messages))
+                    break
+
+                for message in messages:
+                    task = asyncio.create_task(self._process_message(message))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+        finally:
+            stop_task.cancel()
+            if self._tasks:
+                logger.info("SQSConsumer: Draining %s in-flight messages", len(self._tasks))
+                _, pending = await asyncio.wait(set(self._tasks), timeout=settings.SQS_DRAIN_TIMEOUT)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            await self._delete_batcher.close()
+            await asyncio.gather(delete_task, return_exceptions=True)
+
+    def stop(self) -> None:
+        """Asks `run` to stop receiving and drain. Safe to call from any thread and from signal handlers."""
+
+        self._stop_requested = True
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def _reserve_slots(self) -> int:
+        """Waits for at least one free slot, then grabs every other free slot up to the SQS receive limit."""
+
+        await self._slots.acquire()
+        reserved = 1
+        while reserved < SQS_MAX_MESSAGES_PER_RECEIVE and not self._slots.locked():
+            await self._slots.acquire()
+            reserved += 1
+
+        return reserved
+
+    async def _receive_messages(self, max_messages: int) -> List[Dict]:
+        try:
+            response = await asyncio.to_thread(
+                self.sqs_client.receive_message,
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=max_messages,
+                WaitTimeSeconds=settings.SQS_WAIT_TIME_SECONDS,
+                VisibilityTimeout=settings.SQS_VISIBILITY_TIMEOUT,
+                AttributeNames=["SentTimestamp"],
+            )
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"SQSConsumer: Failed to receive messages: {str(e)}")
+            await asyncio.sleep(SQS_ERROR_POLL_DELAY)
+            return []
+
+        messages = response.get("Messages", [])
+        if not messages:
+            await asyncio.sleep(SQS_EMPTY_POLL_DELAY)
+
+        return messages
+
+    async def _process_message(self, message: Dict) -> None:
+        set_correlation_id(message.get("MessageId", "-"))
+        sent_timestamp = message.get("Attributes", {}).get("SentTimestamp")
+        if sent_timestamp:
+            SQS_MESSAGE_LAG.observe(max(0.0, time.time() - int(sent_timestamp) / 1000))
+
+        try:
+            message_body = json.loads(message["Body"])
+            s3_key = message_body.get("s3_key")
+            callback_url = message_body.get("callback_url")
+            if not (s3_key and callback_url):
+                logger.error(f"SQSConsumer: Message {message.get('MessageId')} has no s3_key or callback_url")
+                return
+
+            key = dedupe_key(message["MessageId"], s3_key)
+            if key in self._in_progress:
+                logger.info("SQSConsumer: Message %s is already being processed, skipping", message["MessageId"])
+                return
+            if self.dedupe_store.is_processed(key):
+                logger.info("SQSConsumer: Message %s was already processed, dropping", message["MessageId"])
+                await self._delete_batcher.acknowledge(message["ReceiptHandle"])
+                return
+
+            self._in_progress.add(key)
+            heartbeat = asyncio.create_task(self._extend_visibility(message["ReceiptHandle"]))
+            try:
+                await self.handler(s3_key, callback_url)
+            except asyncio.CancelledError:
+                await self._release_message(message)
+                raise
+            finally:
+                heartbeat.cancel()
+                self._in_progress.discard(key)
+
+            self.dedupe_store.mark_processed(key)
+            await self._delete_batcher.acknowledge(message["ReceiptHandle"])
+        except Exception as e:
+            logger.error(f"SQSConsumer: Failed to process message {message.get('MessageId')}: {str(e)}")
+        finally:
+            self._slots.release()
+
+    async def _release_message(self, message: Dict) -> None:
+        """Makes an unfinished message visible again right away, so another consumer can pick it up."""
+
+        try:
+            await asyncio.to_thread(
+                self.sqs_client.change_message_visibility,
+                QueueUrl=self.queue_url,
+                ReceiptHandle=message["ReceiptHandle"],
+                VisibilityTimeout=0,
+            )
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"SQSConsumer: Failed to release message {message.get('MessageId')}: {str(e)}")
+
+    async def _extend_visibility(self, receipt_handle: str) -> None:
+        """
+        Pushes the visibility timeout of an in-flight message forward until it is cancelled,
+        so long-running documents are not redelivered to another consumer.
+        """
+
+        extended = 0
+        while extended < settings.SQS_MAX_VISIBILITY_EXTENSION:
+            await asyncio.sleep(settings.SQS_HEARTBEAT_INTERVAL)
+            try:
+                await asyncio.to_thread(
+                    self.sqs_client.change_message_visibility,
+                    QueueUrl=self.queue_url,
+                    ReceiptHandle=receipt_handle,
+                    VisibilityTimeout=settings.SQS_VISIBILITY_TIMEOUT,
+                )
+                extended += settings.SQS_HEARTBEAT_INTERVAL
+            except (BotoCoreError, ClientError) as e:
+                logger.error(f"SQSConsumer: Failed to extend message visibility: {str(e)}")
+                return
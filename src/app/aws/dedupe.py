@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from src.settings.config import settings, logger
+
+
+def dedupe_key(message_id: str, s3_key: str) -> str:
+    return f"{message_id}:{s3_key}"
+
+
+class InMemoryDedupeStore:
+    """Remembers processed messages in a bounded, insertion-ordered dictionary."""
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_processed(self, key: str) -> bool:
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at < time.time():
+                del self._entries[key]
+                return False
+            return True
+
+    def mark_processed(self, key: str) -> None:
+        with self._lock:
+            self._entries[key] = time.time() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteDedupeStore:
+    """Remembers processed messages in a local SQLite database, so redeliveries are dropped across restarts."""
+
+    def __init__(self, path: str, ttl: int):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS processed_messages (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+        self._connection.execute("DELETE FROM processed_messages WHERE expires_at < ?", (time.time(),))
+
+    def is_processed(self, key: str) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM processed_messages WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return row is not None
+
+    def mark_processed(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO processed_messages (key, expires_at) VALUES (?, ?)",
+                (key, time.time() + self.ttl),
+            )
+
+
+def get_dedupe_store():
+    """Returns the store of `SQS_DEDUPE_BACKEND`, or the in-memory one if the SQLite database cannot be opened."""
+
+    if settings.SQS_DEDUPE_BACKEND == "sqlite":
+        try:
+            store = SQLiteDedupeStore(settings.SQS_DEDUPE_SQLITE_PATH, ttl=settings.SQS_DEDUPE_TTL)
+            logger.info("Using SQLite dedupe store at %s", settings.SQS_DEDUPE_SQLITE_PATH)
+            return store
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Cannot open the SQLite dedupe store, using the in-memory one: {str(e)}")
+
+    return InMemoryDedupeStore(ttl=settings.SQS_DEDUPE_TTL, max_entries=settings.SQS_DEDUPE_MAX_ENTRIES)
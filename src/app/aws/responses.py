@@ -10,3 +10,4 @@ class AWSErrorResponse(str, Enum):
     ERROR_DOWNLOAD_FILE = "File download failed"
     ERROR_UPLOAD_FILE = "File upload failed"
     FILE_MISSED_OR_EMPTY = "Download failed: file is missing or empty"
+    FILE_TOO_LARGE = "Download rejected: file exceeds the maximum allowed size"
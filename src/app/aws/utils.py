@@ -1,46 +1,100 @@
 import asyncio
+import tempfile
 from concurrent import futures
 from io import BytesIO
-from typing import Tuple, Union
+from typing import BinaryIO, Optional, Tuple, Union
 
 from botocore.exceptions import BotoCoreError, ClientError
 
-from src.app.aws.clients import s3_client
 from src.app.aws.responses import AWSErrorResponse
-from src.settings.config import logger
+from src.app.metrics import file_size, observe_stage, set_document
+from src.app.services import get_storage
+from src.app.services.storage import ObjectInfo, StorageError
+from src.settings.config import logger, settings
 
+_download_executor = futures.ThreadPoolExecutor(
+    max_workers=settings.S3_DOWNLOAD_WORKERS, thread_name_prefix="s3-download"
+)
 
-def sync_download_file_as_bytes(bucket: str, s3_key: str) -> Tuple[Union[BytesIO, str], bool]:
+
+def sync_download_file_as_bytes(location: str) -> Tuple[Union[BinaryIO, str], bool]:
     """
-    Downloads a file from S3 and returns it as BytesIO object.
+    Opens a document from its storage backend.
+    Local and in-memory objects are returned as they are. Objects streamed from S3 up to `S3_SPOOL_THRESHOLD` bytes
+    are kept in memory, larger ones are spooled to a temporary file that is removed when it is closed.
+    Objects over `S3_MAX_OBJECT_SIZE` are rejected before the body is read.
 
-    :param bucket: S3 bucket name.
-    :param s3_key: Destination file name in S3.
-    :return: A Tuple (`BytesIO`, `True`) if the download is successful.
+    :param location: A key of the default storage backend or a storage URI, see `Storage.resolve`.
+    :return: A Tuple (file object, `True`) if the download is successful.
              A Tuple (`str`, `False`) if the download fails.
     """
 
     try:
-        response = s3_client.get_object(Bucket=bucket, Key=s3_key)
-        logger.info(f"File {s3_key} downloaded from S3")
-        return BytesIO(response["Body"].read()), True
-    except (BotoCoreError, ClientError) as e:
-        logger.error(f"Failed to download file from S3: {str(e)}")
+        backend, key = get_storage().resolve(location)
+        body, size = backend.open(key)
+        if size > settings.S3_MAX_OBJECT_SIZE:
+            body.close()
+            logger.error(f"File {location} is {size} bytes, the limit is {settings.S3_MAX_OBJECT_SIZE} bytes")
+            return AWSErrorResponse.FILE_TOO_LARGE, False
+
+        if not backend.streaming:
+            return body, True
+
+        if size <= settings.S3_SPOOL_THRESHOLD:
+            file_obj = BytesIO(body.read())
+        else:
+            file_obj = tempfile.NamedTemporaryFile(dir=settings.S3_SPOOL_DIR or None, suffix=".download")
+            try:
+                for chunk in body.iter_chunks(settings.S3_DOWNLOAD_CHUNK_SIZE):
+                    file_obj.write(chunk)
+                file_obj.flush()
+                file_obj.seek(0)
+            except Exception:
+                file_obj.close()
+                raise
+        body.close()
+
+        logger.debug("File %s downloaded", location)
+        return file_obj, True
+    except (StorageError, BotoCoreError, ClientError) as e:
+        logger.error(f"Failed to download file {location}: {str(e)}")
         return AWSErrorResponse.ERROR_DOWNLOAD_FILE, False
 
 
-async def download_file_as_bytes(bucket: str, s3_key: str) -> Tuple[Union[BytesIO, str], bool]:
+@observe_stage("download")
+async def download_file_as_bytes(location: str) -> Tuple[Union[BinaryIO, str], bool]:
     """
-    Downloads a file from S3 and returns it as BytesIO object.
+    Downloads a document on the shared download pool.
 
-    :param bucket: S3 bucket name.
-    :param s3_key: Destination file name in S3.
-    :return: A Tuple (`BytesIO`, True) if the download is successful.
-             A Tuple (None, False) if the download fails.
+    :param location: A key of the default storage backend or a storage URI, see `Storage.resolve`.
+    :return: A Tuple (file object, True) if the download is successful.
+             A Tuple (`str`, False) if the download fails. The caller must close the returned file.
     """
 
-    loop = asyncio.get_event_loop()
-    with futures.ThreadPoolExecutor() as pool:
-        result = await loop.run_in_executor(pool, sync_download_file_as_bytes, bucket, s3_key)
+    loop = asyncio.get_running_loop()
+    file_obj, is_downloaded = await loop.run_in_executor(_download_executor, sync_download_file_as_bytes, location)
+    if is_downloaded:
+        set_document(location, file_size(file_obj))
+
+    return file_obj, is_downloaded
+
+
+def sync_get_object_info(location: str) -> Optional[ObjectInfo]:
+    """
+    Fetches the ETag and size of a document without downloading its body.
+
+    :param location: A key of the default storage backend or a storage URI, see `Storage.resolve`.
+    :return: The object metadata, or `None` if it is unavailable.
+    """
+
+    try:
+        backend, key = get_storage().resolve(location)
+        return backend.head(key)
+    except StorageError as e:
+        logger.error(f"Failed to fetch object metadata of {location}: {str(e)}")
+        return None
+
 
-    return result
+async def get_object_info(location: str) -> Optional[ObjectInfo]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_download_executor, sync_get_object_info, location)
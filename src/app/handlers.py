@@ -1,36 +1,163 @@
-from typing import Tuple, Dict
+import asyncio
+import sqlite3
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
 
 from botocore.exceptions import ClientError
 
-from src.app.aws.utils import download_file_as_bytes
+from src.app.aws.utils import download_file_as_bytes, get_object_info
+from src.app.metrics import ANALYSES_IN_FLIGHT, file_size, set_document
 from src.app.models.res_statuses import Status
-from src.app.services import get_analysis_service
-from src.settings.config import settings, logger
+from src.app.services import get_admission_controller, get_analysis_service, get_result_cache, get_result_store
+from src.app.services.archive import is_archive
+from src.app.services.result_cache import object_cache_key
+from src.app.services.result_store import content_sha256
+from src.app.utils import callback
+from src.settings.config import logger
+from src.settings.log import correlation_id, set_correlation_id
 
 
-async def text_tonality_analysis_handler(s3_key) -> Tuple[Dict, str]:
+async def text_tonality_analysis_handler(s3_key, admission_timeout: Optional[float] = None) -> Tuple[Dict, str]:
     """
     Handles the text tonality analysis process.
+    Before the download the job reserves memory budget for the document from the admission controller.
+    Results, including errors, are recorded in the result store.
 
-    :param s3_key: File name (or key) in the S3 bucket.
+    :param s3_key: Key of the file in the default storage backend, or a storage URI (`s3://bucket/key`,
+                   `file://path`, `memory://key`).
+    :param admission_timeout: Seconds to wait for memory budget, `None` waits as long as it takes.
     :return:
         - Tuple (`Dict`, `str`) where the dictionary contains sentiment metrics and the string is the status message.
+    :raises AdmissionRejected: If no memory budget became free within `admission_timeout`.
+    """
+
+    result_store = get_result_store()
+    document: Dict[str, Optional[str]] = {}
+    result, status = await _text_tonality_analysis(s3_key, admission_timeout, document, result_store is not None)
+
+    if result_store is not None:
+        try:
+            await asyncio.to_thread(result_store.add, s3_key, status, result, **document)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to store the result of {s3_key}: {str(e)}")
+
+    return result, status
+
+
+async def _text_tonality_analysis(
+    s3_key, admission_timeout: Optional[float], document: Dict[str, Optional[str]], hash_content: bool
+) -> Tuple[Dict, str]:
+    """
+    :param document: Filled with the `etag` and, if `hash_content` is set, the `content_hash` of the document.
     """
 
     analysis_service = get_analysis_service()
-    bucket = settings.AWS_S3_BUCKET_NAME
+    result_cache = get_result_cache()
+    admission = get_admission_controller()
+    reserved = 0
 
+    set_document(s3_key)
+    ANALYSES_IN_FLIGHT.inc()
     try:
-        download_result, is_downloaded = await download_file_as_bytes(bucket, s3_key)
+        cache_key = None
+        object_info = None
+        if result_cache is not None or admission is not None:
+            object_info = await get_object_info(s3_key)
+            document["etag"] = object_info.etag if object_info is not None else None
+
+        if result_cache is not None and object_info is not None and object_info.etag:
+            cache_key = object_cache_key(s3_key, object_info.etag)
+            cached_result = await result_cache.get(cache_key)
+            if cached_result is not None:
+                logger.debug("Returning cached analysis result for %s", s3_key)
+                return cached_result, Status.SUCCESS.value
+
+        if admission is not None:
+            size = object_info.size if object_info is not None else None
+            reserved = await admission.acquire(admission.estimate(size, is_archive(s3_key)), admission_timeout)
+
+        download_result, is_downloaded = await download_file_as_bytes(s3_key)
         if not is_downloaded:
             logger.error(f"File download failed. Details: {download_result}")
-            return {"message": download_result}, Status.ERROR
+            return {"message": download_result}, Status.ERROR.value
+
+        try:
+            if hash_content:
+                document["content_hash"] = await asyncio.to_thread(content_sha256, download_result)
+            result, is_processed = await analysis_service.file_processing(s3_key, download_result)
+        finally:
+            download_result.close()
 
-        result, is_processed = await analysis_service.file_processing(s3_key, download_result)
         if not is_processed:
             return {"message": result}, Status.ERROR.value
 
+        if cache_key is not None:
+            await result_cache.set(cache_key, result)
+
         return result, Status.SUCCESS.value
 
     except ClientError as error:
         return {"message": error.response["Error"]["Message"]}, Status.ERROR.value
+    finally:
+        if reserved:
+            admission.release(reserved)
+        ANALYSES_IN_FLIGHT.dec()
+
+
+async def uploaded_file_analysis_handler(filename: str, file_obj: BinaryIO) -> Tuple[Dict, str]:
+    """
+    Analyses a file uploaded with the request. The file goes straight to the extractor, without a storage round trip.
+
+    :param filename: Name of the uploaded file, its extension selects the extractor.
+    :param file_obj: Uploaded file content. The caller closes it.
+    :return:
+        - Tuple (`Dict`, `str`) where the dictionary contains sentiment metrics and the string is the status message.
+    """
+
+    set_document(filename, file_size(file_obj))
+    ANALYSES_IN_FLIGHT.inc()
+    try:
+        result, is_processed = await get_analysis_service().file_processing(filename, file_obj)
+        if not is_processed:
+            return {"message": result}, Status.ERROR.value
+        return result, Status.SUCCESS.value
+    finally:
+        ANALYSES_IN_FLIGHT.dec()
+
+
+async def batch_text_tonality_analysis_handler(
+    items: List[Tuple[str, Optional[str]]], max_concurrency: int
+) -> AsyncIterator[Dict]:
+    """
+    Analyses many files concurrently and yields each result as soon as it is ready.
+
+    :param items: List of (`s3_key`, `callback_url`) pairs. The callback URL is optional.
+    :param max_concurrency: Maximum number of files processed at the same time.
+    :return: An async iterator of result dictionaries in completion order. Each one contains the item `index`,
+             the `s3_key`, the `status` and, if a callback URL was given, the `callback_status`.
+    """
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def process_item(index: int, s3_key: str, callback_url: Optional[str]) -> Dict:
+        set_correlation_id(f"{correlation_id.get()}:{index}")
+        async with semaphore:
+            try:
+                result, status = await text_tonality_analysis_handler(s3_key)
+                result["s3_key"] = s3_key
+                if callback_url:
+                    response = await callback(callback_url, status=status, data=result)
+                    result["callback_status"] = response["status"]
+            except Exception as e:
+                logger.error(f"Batch item {s3_key} failed: {str(e)}")
+                result, status = {"message": str(e), "s3_key": s3_key}, Status.ERROR.value
+
+            result["status"] = status
+            return {"index": index, **result}
+
+    tasks = [asyncio.create_task(process_item(index, *item)) for index, item in enumerate(items)]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
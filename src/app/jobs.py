@@ -0,0 +1,120 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from src.app.handlers import text_tonality_analysis_handler
+from src.app.metrics import JOB_QUEUE_DEPTH
+from src.app.models.res_statuses import Status
+from src.app.utils import callback
+from src.settings.config import settings, logger
+from src.settings.log import set_correlation_id
+
+_job_manager = None
+
+
+class Job:
+    def __init__(self, s3_key: str, callback_url: str):
+        self.id = uuid.uuid4().hex
+        self.s3_key = s3_key
+        self.callback_url = callback_url
+        self.status = Status.WAITING.value
+        self.result: Optional[Dict] = None
+        self.callback_status: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "s3_key": self.s3_key,
+            "status": self.status,
+            "result": self.result,
+            "callback_status": self.callback_status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Runs analysis jobs from a bounded in-process queue on a fixed number of worker tasks,
+    so the HTTP request can return as soon as the job is accepted.
+    """
+
+    def __init__(self, queue_size: int, workers: int, max_retained: int):
+        self.workers = workers
+        self.max_retained = max_retained
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+        JOB_QUEUE_DEPTH.set_function(self._queue.qsize)
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, s3_key: str, callback_url: str) -> Optional[Job]:
+        """
+        Enqueues a job.
+
+        :param s3_key: File name (or key) in the S3 bucket.
+        :param callback_url: Callback URL of an external service.
+        :return: The accepted job, or `None` if the queue is full.
+        """
+
+        job = Job(s3_key, callback_url)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return None
+
+        self._jobs[job.id] = job
+        self._evict_finished()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            set_correlation_id(job.id)
+            job.status = Status.PROCESSING.value
+            try:
+                result, status = await text_tonality_analysis_handler(job.s3_key)
+                result["s3_key"] = job.s3_key
+                response = await callback(job.callback_url, status=status, data=result)
+                job.result, job.status, job.callback_status = result, status, response["status"]
+            except Exception as e:
+                logger.error(f"JobManager: Job {job.id} failed: {str(e)}")
+                job.result, job.status = {"message": str(e), "s3_key": job.s3_key}, Status.ERROR.value
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+    def _evict_finished(self) -> None:
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_retained:
+                break
+            if self._jobs[job_id].finished_at is not None:
+                del self._jobs[job_id]
+
+
+def get_job_manager() -> JobManager:
+    global _job_manager
+
+    if _job_manager is None:
+        _job_manager = JobManager(
+            queue_size=settings.JOBS_QUEUE_SIZE,
+            workers=settings.JOBS_WORKERS,
+            max_retained=settings.JOBS_MAX_RETAINED,
+        )
+
+    return _job_manager
@@ -0,0 +1,100 @@
+import functools
+import inspect
+import os
+import time
+from contextvars import ContextVar
+from typing import BinaryIO, Callable, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+FILE_TYPES = ("txt", "docx", "pdf")
+SIZE_BUCKETS = ((64 * 1024, "lt_64k"), (1024 * 1024, "lt_1m"), (16 * 1024 * 1024, "lt_16m"))
+LATENCY_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+LAG_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+STAGE_DURATION = Histogram(
+    "tonality_stage_duration_seconds",
+    "Time spent in each pipeline stage.",
+    ["stage", "file_type", "size_bucket"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "tonality_stage_errors_total",
+    "Pipeline stages that raised an exception.",
+    ["stage", "file_type", "size_bucket"],
+)
+ANALYSES_IN_FLIGHT = Gauge("tonality_analyses_in_flight", "Documents being analysed right now.")
+JOB_QUEUE_DEPTH = Gauge("tonality_job_queue_depth", "Async jobs waiting for a worker.")
+ADMISSION_RESERVED_BYTES = Gauge("tonality_admission_reserved_bytes", "Memory budget reserved by admitted jobs.")
+ADMISSION_WAITING = Gauge("tonality_admission_waiting", "Jobs waiting for memory budget.")
+ADMISSION_REJECTIONS = Counter("tonality_admission_rejections_total", "Jobs rejected for lack of memory budget.")
+SQS_MESSAGE_LAG = Histogram(
+    "tonality_sqs_message_lag_seconds",
+    "Time between a message being sent to the queue and the consumer starting on it.",
+    buckets=LAG_BUCKETS,
+)
+
+# (file type, size bucket) of the document handled by the current task; asyncio.to_thread carries it along.
+_document_labels: ContextVar[Tuple[str, str]] = ContextVar("document_labels", default=("unknown", "unknown"))
+
+
+def size_bucket(size: Optional[int]) -> str:
+    if size is None:
+        return "unknown"
+    return next((label for limit, label in SIZE_BUCKETS if size < limit), "ge_16m")
+
+
+def file_size(file_bytes: BinaryIO) -> Optional[int]:
+    try:
+        return os.fstat(file_bytes.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return len(file_bytes.getbuffer()) if hasattr(file_bytes, "getbuffer") else None
+
+
+def set_document(s3_key: str, size: Optional[int] = None) -> None:
+    """Labels the metrics recorded by the current task with the file type and size bucket of the document."""
+
+    extension = s3_key.rpartition(".")[2].lower()
+    _document_labels.set((extension if extension in FILE_TYPES else "other", size_bucket(size)))
+
+
+def observe_stage(stage: str) -> Callable:
+    """
+    Decorates a sync or async function to record its duration (and exceptions) as a pipeline stage.
+    Labels are read when the call ends, so a stage that discovers the document size is labelled with it.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        def record(started: float, failed: bool) -> None:
+            labels = (stage, *_document_labels.get())
+            STAGE_DURATION.labels(*labels).observe(time.perf_counter() - started)
+            if failed:
+                STAGE_ERRORS.labels(*labels).inc()
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started, failed = time.perf_counter(), True
+                try:
+                    result = await func(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    record(started, failed)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started, failed = time.perf_counter(), True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                record(started, failed)
+
+        return wrapper
+
+    return decorator
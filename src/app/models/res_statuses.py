@@ -6,3 +6,4 @@ class Status(str, Enum):
     PROCESSING = "processing"
     WAITING = "waiting"
     ERROR = "error"
+    SKIPPED = "skipped"
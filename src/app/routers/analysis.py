@@ -1,27 +1,226 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from starlette.responses import JSONResponse
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import List, Literal, Optional
 
-from src.app.handlers import text_tonality_analysis_handler
+from fastapi import APIRouter, Query, Request
+from pydantic import BaseModel, Field
+from starlette.datastructures import UploadFile
+from starlette.responses import JSONResponse, StreamingResponse
+
+from src.app.handlers import (
+    text_tonality_analysis_handler,
+    batch_text_tonality_analysis_handler,
+    uploaded_file_analysis_handler,
+)
+from src.app.jobs import get_job_manager
 from src.app.models.res_statuses import Status
+from src.app.services import get_admission_controller, get_result_cache, get_result_store
+from src.app.services.archive import is_archive
+from src.app.services.memory import AdmissionRejected
 from src.app.utils import callback
+from src.settings.config import settings
 
 router = APIRouter()
 
 
+def timestamp(value: Optional[datetime]) -> Optional[float]:
+    """Converts a query datetime to Unix time. Datetimes without a timezone are UTC."""
+
+    if value is None:
+        return None
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def overloaded(error: AdmissionRejected) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"status": Status.ERROR, "message": f"Service is overloaded: {error}"},
+        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+    )
+
+
 class AnalysisRequest(BaseModel):
     s3_key: str
     callback_url: str
 
 
+class BatchAnalysisItem(BaseModel):
+    s3_key: str
+    callback_url: Optional[str] = None
+
+
+class BatchAnalysisRequest(BaseModel):
+    items: List[BatchAnalysisItem] = Field(min_length=1, max_length=settings.BATCH_MAX_ITEMS)
+    callback_url: Optional[str] = None
+
+
 @router.post("/tonality")
-async def analyse_text_tonality(request: AnalysisRequest) -> JSONResponse:
+async def analyse_text_tonality(
+    request: AnalysisRequest, mode: Literal["sync", "async"] = Query("sync")
+) -> JSONResponse:
+    if mode == "async":
+        job = get_job_manager().submit(request.s3_key, request.callback_url)
+        if job is None:
+            return JSONResponse(
+                status_code=503,
+                content={"status": Status.ERROR, "message": "Job queue is full"},
+                headers={"Retry-After": str(settings.JOBS_RETRY_AFTER)},
+            )
+        return JSONResponse(
+            status_code=202,
+            content={"status": job.status, "job_id": job.id, "status_url": f"/api/v1/analysis/jobs/{job.id}"},
+        )
+
     try:
-        result, status = await text_tonality_analysis_handler(request.s3_key)
+        result, status = await text_tonality_analysis_handler(
+            request.s3_key, admission_timeout=settings.ADMISSION_HTTP_TIMEOUT
+        )
         result["s3_key"] = request.s3_key
         response: dict = await callback(request.callback_url, status=status, data=result)
         if response["status"] == Status.SUCCESS:
             return JSONResponse(status_code=201, content={"status": Status.SUCCESS})
+        if response["status"] == Status.WAITING:
+            return JSONResponse(status_code=202, content=response)
         return JSONResponse(status_code=500, content=response)
+    except AdmissionRejected as e:
+        return overloaded(e)
     except Exception as e:
         return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+
+
+@router.post("/tonality/upload")
+async def analyse_uploaded_file(request: Request) -> JSONResponse:
+    """
+    Analyses a document sent as the `file` field of a multipart form and returns the result in the response.
+    An optional `callback_url` form field also delivers the result as a callback.
+    The body must declare its `Content-Length`, so oversized uploads are rejected before any of it is read;
+    the server does not accept more bytes than declared.
+    """
+
+    too_large = JSONResponse(
+        status_code=413,
+        content={"status": Status.ERROR, "message": f"File exceeds the limit of {settings.UPLOAD_MAX_SIZE} bytes"},
+    )
+    content_length = request.headers.get("content-length", "")
+    if not content_length.isdigit():
+        return JSONResponse(
+            status_code=411, content={"status": Status.ERROR, "message": "Content-Length header is required"}
+        )
+    content_length = int(content_length)
+    if content_length > settings.UPLOAD_MAX_SIZE:
+        return too_large
+
+    admission = get_admission_controller()
+    reserved = 0
+    try:
+        if admission is not None:
+            size = admission.estimate(content_length)
+            reserved = await admission.acquire(size, settings.ADMISSION_HTTP_TIMEOUT)
+
+        async with request.form(max_files=1, max_fields=1) as form:
+            upload, callback_url = form.get("file"), form.get("callback_url")
+            if not isinstance(upload, UploadFile) or not upload.filename:
+                return JSONResponse(
+                    status_code=422, content={"status": Status.ERROR, "message": "Form field `file` is required"}
+                )
+            if upload.size is not None and upload.size > settings.UPLOAD_MAX_SIZE:
+                return too_large
+            if admission is not None and is_archive(upload.filename):
+                # The name is only known now: reserve again for the archive, never holding one reservation
+                # while waiting for another
+                admission.release(reserved)
+                reserved = 0
+                size = admission.estimate(content_length, archive=True)
+                reserved = await admission.acquire(size, settings.ADMISSION_HTTP_TIMEOUT)
+
+            try:
+                result, status = await uploaded_file_analysis_handler(upload.filename, upload.file)
+            except Exception as e:
+                return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+    except AdmissionRejected as e:
+        return overloaded(e)
+    finally:
+        if reserved:
+            admission.release(reserved)
+
+    result["filename"] = upload.filename
+    if isinstance(callback_url, str) and callback_url:
+        response: dict = await callback(callback_url, status=status, data=dict(result))
+        result["callback_status"] = response["status"]
+
+    result["status"] = status
+    return JSONResponse(status_code=200 if status == Status.SUCCESS else 422, content=result)
+
+
+@router.post("/tonality/batch")
+async def analyse_text_tonality_batch(request: BatchAnalysisRequest) -> StreamingResponse:
+    items = [(item.s3_key, item.callback_url or request.callback_url) for item in request.items]
+
+    async def stream_results():
+        async for result in batch_text_tonality_analysis_handler(items, settings.BATCH_MAX_CONCURRENCY):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str) -> JSONResponse:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": Status.ERROR, "message": "Job not found"})
+    return JSONResponse(status_code=200, content=job.to_dict())
+
+
+@router.get("/cache/stats")
+async def result_cache_stats() -> JSONResponse:
+    result_cache = get_result_cache()
+    if result_cache is None:
+        return JSONResponse(status_code=200, content={"enabled": False})
+    return JSONResponse(status_code=200, content={"enabled": True, **result_cache.stats()})
+
+
+@router.get("/results")
+async def aggregate_results(
+    since: Optional[datetime] = Query(None, description="Start of the time range, inclusive"),
+    until: Optional[datetime] = Query(None, description="End of the time range, exclusive"),
+    status: Optional[Status] = Query(None),
+    prefix: Optional[str] = Query(None, description="Only documents whose key starts with this prefix"),
+    group_by: Literal["status", "polarity_status", "subjectivity_status", "objective_sentiment_status"] = Query(
+        "status"
+    ),
+) -> JSONResponse:
+    """Counts stored results and averages their scores per group, without reprocessing any document."""
+
+    result_store = get_result_store()
+    if result_store is None:
+        return JSONResponse(status_code=404, content={"status": Status.ERROR, "message": "Result store is disabled"})
+
+    groups = await asyncio.to_thread(
+        result_store.aggregate,
+        timestamp(since),
+        timestamp(until),
+        status.value if status is not None else None,
+        prefix,
+        group_by,
+    )
+    return JSONResponse(
+        status_code=200,
+        content={"group_by": group_by, "count": sum(group["count"] for group in groups), "groups": groups},
+    )
+
+
+@router.get("/results/{s3_key:path}")
+async def get_stored_result(s3_key: str, content_hash: Optional[str] = Query(None)) -> JSONResponse:
+    """Returns the latest stored result of a document, optionally of one version of its content."""
+
+    result_store = get_result_store()
+    if result_store is None:
+        return JSONResponse(status_code=404, content={"status": Status.ERROR, "message": "Result store is disabled"})
+
+    stored = await asyncio.to_thread(result_store.latest, s3_key, content_hash)
+    if stored is None:
+        return JSONResponse(status_code=404, content={"status": Status.ERROR, "message": "Result not found"})
+
+    stored["created_at"] = datetime.fromtimestamp(stored["created_at"], timezone.utc).isoformat()
+    return JSONResponse(status_code=200, content=stored)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Request
+from starlette.responses import JSONResponse
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def liveness() -> JSONResponse:
+    return JSONResponse(status_code=200, content={"status": "alive"})
+
+
+@router.get("/ready")
+async def readiness(request: Request) -> JSONResponse:
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return JSONResponse(status_code=200, content={"status": "ready"})
@@ -1,16 +1,222 @@
+import asyncio
+import sqlite3
+import threading
+import weakref
+
+_analysis_service = None
+_text_extractor_service = None
+_translator_service = None
+_process_pool_engine = None
+_result_cache = None
+_language_detector = None
+_callback_outbox = None
+_callback_outbox_opened = False
+_storage = None
+_admission_controller = None
+_result_store = None
+_result_store_opened = False
+_callback_dispatchers = weakref.WeakKeyDictionary()
+_singleton_lock = threading.RLock()
+
+
 def get_analysis_service():
+    global _analysis_service
     from src.app.services.analysis import TextTonalityAnalysisService
 
-    return TextTonalityAnalysisService()
+    with _singleton_lock:
+        if _analysis_service is None:
+            _analysis_service = TextTonalityAnalysisService()
+
+    return _analysis_service
 
 
 def get_text_extractor_service():
+    global _text_extractor_service
     from src.app.services.text_extractor import TextExtractorService
 
-    return TextExtractorService()
+    with _singleton_lock:
+        if _text_extractor_service is None:
+            _text_extractor_service = TextExtractorService()
+
+    return _text_extractor_service
 
 
 def get_translator_service():
-    from src.app.services.translator import TranslatorService
+    """Returns the process-wide translator on the configured backend."""
+
+    global _translator_service
+    from src.app.services.translator import (
+        RateLimiter,
+        TranslationCache,
+        TranslatorService,
+        create_translation_backend,
+    )
+    from src.settings.config import settings
+
+    with _singleton_lock:
+        if _translator_service is None:
+            max_entries = settings.TRANSLATION_CACHE_MAX_ENTRIES
+            _translator_service = TranslatorService(
+                backend=create_translation_backend(settings.TRANSLATION_BACKEND),
+                cache=TranslationCache(max_entries) if max_entries else None,
+                rate_limiter=RateLimiter(settings.TRANSLATION_RATE_LIMIT),
+            )
+
+    return _translator_service
+
+
+def get_process_pool_engine():
+    global _process_pool_engine
+    from src.app.services.process_pool import ProcessPoolEngine
+    from src.settings.config import settings
+
+    with _singleton_lock:
+        if _process_pool_engine is None:
+            _process_pool_engine = ProcessPoolEngine(
+                max_workers=settings.PROCESS_POOL_WORKERS,
+                max_tasks_per_child=settings.PROCESS_POOL_MAX_TASKS_PER_CHILD,
+            )
+
+    return _process_pool_engine
+
+
+def get_language_detector():
+    global _language_detector
+    from src.app.services.language import LanguageDetector
+    from src.settings.config import settings
+
+    with _singleton_lock:
+        if _language_detector is None:
+            _language_detector = LanguageDetector(
+                seed=settings.LANGUAGE_DETECTION_SEED,
+                spans=settings.LANGUAGE_DETECTION_SPANS,
+                span_length=settings.LANGUAGE_DETECTION_SPAN_LENGTH,
+                cache_size=settings.LANGUAGE_DETECTION_CACHE_SIZE,
+                identify_non_latin=settings.SENTIMENT_MULTILINGUAL,
+            )
+
+    return _language_detector
+
+
+def get_result_cache():
+    """Returns the process-wide result cache, or `None` if caching is disabled."""
+
+    global _result_cache
+    from src.app.services.result_cache import ResultCache
+    from src.settings.config import settings
+
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+
+    with _singleton_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(
+                max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+                disk_path=settings.RESULT_CACHE_DISK_PATH,
+                disk_max_bytes=settings.RESULT_CACHE_DISK_MAX_BYTES,
+            )
+
+    return _result_cache
+
+
+def get_result_store():
+    """Returns the process-wide store of analysis results, or `None` if it is disabled or cannot be opened."""
+
+    global _result_store, _result_store_opened
+    from src.app.services.result_store import ResultStore
+    from src.settings.config import logger, settings
+
+    if not settings.RESULT_STORE_PATH:
+        return None
+
+    with _singleton_lock:
+        if not _result_store_opened:
+            _result_store_opened = True
+            try:
+                _result_store = ResultStore(settings.RESULT_STORE_PATH)
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f"Cannot open the result store, results are not stored: {str(e)}")
+
+    return _result_store
+
+
+def get_storage():
+    """Returns the process-wide storage that resolves document locations to backends."""
+
+    global _storage
+    from src.app.aws.clients import s3_client
+    from src.app.services.storage import create_storage
+    from src.settings.config import settings
+
+    with _singleton_lock:
+        if _storage is None:
+            _storage = create_storage(
+                backend=settings.STORAGE_BACKEND,
+                s3_client=s3_client,
+                s3_buckets=[bucket.strip() for bucket in settings.STORAGE_S3_BUCKETS.split(",") if bucket.strip()],
+                default_bucket=settings.AWS_S3_BUCKET_NAME,
+                local_root=settings.STORAGE_LOCAL_ROOT,
+            )
+
+    return _storage
+
+
+def get_admission_controller():
+    """Returns the process-wide admission controller, or `None` if admission control is disabled."""
+
+    global _admission_controller
+    from src.app.services.memory import AdmissionController
+    from src.settings.config import settings
+
+    if not settings.ADMISSION_MEMORY_BUDGET:
+        return None
+
+    with _singleton_lock:
+        if _admission_controller is None:
+            _admission_controller = AdmissionController(
+                capacity=settings.ADMISSION_MEMORY_BUDGET,
+                multiplier=settings.ADMISSION_MEMORY_MULTIPLIER,
+                default_estimate=settings.ADMISSION_DEFAULT_ESTIMATE,
+                archive_budget=settings.ARCHIVE_MEMORY_BUDGET,
+            )
+
+    return _admission_controller
+
+
+def get_callback_dispatcher():
+    """Returns the callback dispatcher of the running event loop. All dispatchers share one outbox."""
+
+    global _callback_outbox, _callback_outbox_opened
+    from src.app.services.callback import CallbackDispatcher, CallbackOutbox
+    from src.settings.config import logger, settings
+
+    loop = asyncio.get_running_loop()
+    with _singleton_lock:
+        if not _callback_outbox_opened and settings.CALLBACK_OUTBOX_PATH:
+            _callback_outbox_opened = True
+            try:
+                _callback_outbox = CallbackOutbox(settings.CALLBACK_OUTBOX_PATH)
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f"Cannot open the callback outbox, callbacks are not deferred: {str(e)}")
+
+        dispatcher = _callback_dispatchers.get(loop)
+        if dispatcher is None:
+            dispatcher = _callback_dispatchers[loop] = CallbackDispatcher(_callback_outbox)
+
+    return dispatcher
+
+
+def warm_up_services() -> None:
+    """
+    Builds the services and loads everything they would otherwise load on the first request:
+    the process pool workers (with the extraction and scoring libraries), the language profiles
+    and the extraction libraries of this process. Blocking, so it is run in a thread.
+    """
+
+    from src.settings.config import logger
 
-    return TranslatorService()
+    get_process_pool_engine().start()
+    get_language_detector().load()
+    get_analysis_service()
+    get_result_store()
+    logger.info("Services warmed up")
@@ -1,6 +1,10 @@
 import asyncio
 import re
-from typing import Tuple, Dict, Union
+import tarfile
+import zipfile
+from enum import Enum
+from io import BytesIO
+from typing import BinaryIO, Tuple, Dict, List, Optional, Union
 
 from textblob import TextBlob
 
@@ -12,41 +16,270 @@ from src.app.models.analysis_statuses import (
     OBJECTIVE_SENTIMENT_DESCRIPTIONS,
     OBJECTIVE_SENTIMENT_RANGES,
 )
-from src.app.services import get_text_extractor_service, get_translator_service
-from src.app.utils import is_eng_text
-from src.settings.config import logger
+from src.app.metrics import observe_stage, set_document
+from src.app.models.res_statuses import Status
+from src.app.services import (
+    get_text_extractor_service,
+    get_translator_service,
+    get_process_pool_engine,
+    get_result_cache,
+)
+from src.app.services.archive import ArchiveEntry, is_archive, is_document, iter_archive_entries
+from src.app.services.chunking import sample_windows, split_into_windows, weighted_average
+from src.app.services.memory import MemoryBudget
+from src.app.services.multilingual import find_lexicons
+from src.app.services.result_cache import text_cache_key
+from src.app.services.translator import TranslationError
+from src.app.utils import detect_language
+from src.settings.config import logger, settings
+
+_lexicon_scorer = None
+_multilingual_scorer = None
+
+
+def _get_lexicon_scorer():
+    """Builds the lexicon tables once per worker process."""
+
+    global _lexicon_scorer
+
+    if _lexicon_scorer is None:
+        from src.app.services.lexicon_scorer import LexiconSentimentScorer
+
+        _lexicon_scorer = LexiconSentimentScorer()
+
+    return _lexicon_scorer
+
+
+def _get_multilingual_scorer():
+    """Builds the native lexicons of the multilingual mode once per worker process."""
+
+    global _multilingual_scorer
+
+    if _multilingual_scorer is None:
+        from src.app.services.multilingual import MultilingualSentimentScorer
+
+        _multilingual_scorer = MultilingualSentimentScorer(find_lexicons(settings.SENTIMENT_LEXICON_DIR))
+
+    return _multilingual_scorer
+
+
+def load_native_lexicons() -> None:
+    """Runs in a worker process at startup. Loads the lexicons of the multilingual mode, if it is enabled."""
+
+    if settings.SENTIMENT_MULTILINGUAL:
+        _get_multilingual_scorer().load()
+
+
+def score_sentiment(text: str, language: str = "en") -> Tuple[float, float]:
+    """
+    Runs in a worker process. Returns the (polarity, subjectivity) pair, computed once: English with the configured
+    engine, other languages with their native lexicon.
+    """
+
+    if language != "en":
+        return _get_multilingual_scorer().score(text, language)
+
+    if settings.SENTIMENT_ENGINE == "lexicon":
+        return _get_lexicon_scorer().score(text)
+
+    sentiment = TextBlob(text).sentiment
+    return sentiment.polarity, sentiment.subjectivity
+
+
+def score_sentiment_batch(texts: List[str], language: str = "en") -> List[Tuple[float, float]]:
+    """Runs in a worker process. Scores several texts in one job to save on inter-process round trips."""
+
+    if language == "en" and settings.SENTIMENT_ENGINE == "lexicon":
+        return _get_lexicon_scorer().score_batch(texts)
+
+    return [score_sentiment(text, language) for text in texts]
+
+
+def _status_for(score: float, ranges: List[Tuple[float, float, Enum]]) -> Enum:
+    """Finds the range holding the score. Ranges are half-open, except that the top of the scale is included."""
+
+    status = next((status for min_val, max_val, status in ranges if min_val <= score < max_val), None)
+    if status is None:
+        top_min, top_max, top_status = max(ranges, key=lambda score_range: score_range[1])
+        if top_min <= score <= top_max:
+            return top_status
+        raise ValueError(f"Score {score} is out of range")
+
+    return status
 
 
 class TextTonalityAnalysisService:
     def __init__(self):
         self.text_extractor = get_text_extractor_service()
         self.translator = get_translator_service()
+        self.engine = get_process_pool_engine()
+        self.result_cache = get_result_cache()
+        self.native_languages = frozenset()
+        if settings.SENTIMENT_MULTILINGUAL:
+            self.native_languages = frozenset(find_lexicons(settings.SENTIMENT_LEXICON_DIR))
+            if not self.native_languages:
+                logger.warning("TextTonalityAnalysisService: No sentiment lexicons, every language is translated")
+            else:
+                logger.info(
+                    "TextTonalityAnalysisService: Scoring natively: %s", ", ".join(sorted(self.native_languages))
+                )
 
     async def file_processing(self, s3_key, file_bytes) -> Tuple[Union[Dict, str], bool]:
         """
         Extracts text from a file and performs sentiment analysis.
 
-        :param s3_key: File name (or key) in the S3 bucket.
+        :param s3_key: File name (or key) in the S3 bucket. Archives (`.zip`, `.tar`, `.tar.gz`, `.tgz`) are
+                       handled by `archive_processing`.
         :param file_bytes: File content as a BytesIO object.
         :return:
             - Tuple (`Dict`, `True`) if the analysis is successful. The dictionary contains sentiment metrics.
             - Tuple (`str`, `False`) if an error occurs, with an error message.
         """
 
+        if is_archive(s3_key):
+            return await self.archive_processing(s3_key, file_bytes)
+
         try:
             text, is_extracted = await self.text_extractor.extract_text(s3_key, file_bytes)
             if not is_extracted:
                 logger.error(f"TextTonalityAnalysisService: An error occurred while extracting the text")
                 return "An error occurred while extracting the text", False
 
-            return await self._sentiment_analysis(text), True
+            if self.result_cache is None:
+                return await self._sentiment_analysis(text), True
+
+            cache_key = text_cache_key(text)
+            result = await self.result_cache.get(cache_key)
+            if result is None:
+                result = await self._sentiment_analysis(text)
+                await self.result_cache.set(cache_key, result)
+
+            return result, True
+        except TranslationError as e:
+            logger.error(f"TextTonalityAnalysisService: {str(e)}")
+            return "The text could not be translated", False
         except Exception as e:
             logger.error(f"TextTonalityAnalysisService {str(e)}")
             return "Internal Error", False
 
+    async def archive_processing(self, s3_key, file_bytes: BinaryIO) -> Tuple[Union[Dict, str], bool]:
+        """
+        Analyses every document of a ZIP or tar archive. Entries are read one by one from the archive and analysed
+        concurrently (`ARCHIVE_CONCURRENCY`), while the estimated memory of the entries being analysed (their size
+        times `ADMISSION_MEMORY_MULTIPLIER`) stays within `ARCHIVE_MEMORY_BUDGET`, which the admission controller
+        reserves with the archive.
+
+        :param s3_key: Archive name (or key) in the S3 bucket.
+        :param file_bytes: Archive content as a seekable file.
+        :return:
+            - Tuple (`Dict`, `True`) if at least one document is analysed. The dictionary contains the sentiment
+              metrics of the whole archive (mean polarity and subjectivity of its documents), the `archive` counters
+              and the per-document `entries`, in archive order.
+            - Tuple (`str`, `False`) if the archive cannot be read or none of its documents can be analysed.
+        """
+
+        entries: List[Optional[Dict]] = []
+        tasks = []
+        budget = MemoryBudget(settings.ARCHIVE_MEMORY_BUDGET)
+        slots = asyncio.Semaphore(settings.ARCHIVE_CONCURRENCY)
+        archive_entries = iter_archive_entries(file_bytes, s3_key)
+        total_size, truncated = 0, False
+
+        try:
+            while (entry := await asyncio.to_thread(next, archive_entries, None)) is not None:
+                if len(entries) >= settings.ARCHIVE_MAX_ENTRIES:
+                    truncated = True
+                    break
+                if not is_document(entry.name):
+                    entries.append(
+                        {"name": entry.name, "status": Status.SKIPPED.value, "message": "Unsupported file type"}
+                    )
+                    continue
+                if entry.size > settings.ARCHIVE_MAX_ENTRY_SIZE:
+                    entries.append({"name": entry.name, "status": Status.SKIPPED.value, "message": "File is too large"})
+                    continue
+                total_size += entry.size
+                if total_size > settings.ARCHIVE_MAX_TOTAL_SIZE:
+                    truncated = True
+                    break
+
+                await slots.acquire()
+                reserved = await budget.acquire(int(entry.size * settings.ADMISSION_MEMORY_MULTIPLIER))
+                try:
+                    data = await asyncio.to_thread(entry.read, settings.ARCHIVE_MAX_ENTRY_SIZE + 1)
+                except BaseException:
+                    slots.release()
+                    await budget.release(reserved)
+                    raise
+
+                entries.append(None)
+                tasks.append(
+                    asyncio.create_task(
+                        self._archive_entry_processing(len(entries) - 1, entry, data, reserved, budget, slots)
+                    )
+                )
+
+            for index, result in await asyncio.gather(*tasks):
+                entries[index] = result
+        except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+            logger.error(f"TextTonalityAnalysisService: Cannot read archive {s3_key}: {str(e)}")
+            return "The archive cannot be read", False
+        finally:
+            for task in tasks:
+                task.cancel()
+            archive_entries.close()
+
+        analysed = [entry for entry in entries if entry["status"] == Status.SUCCESS.value]
+        if not analysed:
+            return "No document in the archive could be analysed", False
+
+        polarity = sum(entry["polarity"] for entry in analysed) / len(analysed)
+        subjectivity = sum(entry["subjectivity"] for entry in analysed) / len(analysed)
+        objective_sentiment_score = await self._calculate_objective_sentiment(polarity, subjectivity)
+        response = {
+            "polarity": polarity,
+            "subjectivity": subjectivity,
+            "objective_sentiment_score": objective_sentiment_score,
+        }
+        response.update(await self._generate_status_and_description(polarity, subjectivity, objective_sentiment_score))
+        response["archive"] = {
+            "entries": len(entries),
+            "analysed": len(analysed),
+            "failed": sum(1 for entry in entries if entry["status"] == Status.ERROR.value),
+            "skipped": sum(1 for entry in entries if entry["status"] == Status.SKIPPED.value),
+            "truncated": truncated,
+        }
+        response["entries"] = entries
+        return response, True
+
+    async def _archive_entry_processing(
+        self,
+        index: int,
+        entry: ArchiveEntry,
+        data: bytes,
+        reserved: int,
+        budget: MemoryBudget,
+        slots: asyncio.Semaphore,
+    ) -> Tuple[int, Dict]:
+        try:
+            if len(data) > settings.ARCHIVE_MAX_ENTRY_SIZE:
+                return index, {"name": entry.name, "status": Status.SKIPPED.value, "message": "File is too large"}
+
+            set_document(entry.name, len(data))
+            result, is_processed = await self.file_processing(entry.name, BytesIO(data))
+            if not is_processed:
+                return index, {"name": entry.name, "status": Status.ERROR.value, "message": result}
+            return index, {"name": entry.name, "status": Status.SUCCESS.value, **result}
+        finally:
+            del data
+            slots.release()
+            await budget.release(reserved)
+
+    @observe_stage("sentiment_analysis")
     async def _sentiment_analysis(self, text: str) -> Dict[str, Union[str, float]]:
         """
-        Cleans the text, detects the language, translates it if necessary, and then performs sentiment analysis.
+        Cleans the text, detects the language, and then performs sentiment analysis. In the multilingual mode,
+        languages with a native lexicon are scored directly; the others are translated into English first.
 
         :param text: The input text to be analyzed.
         :return: A dictionary containing:
@@ -59,16 +292,24 @@ class TextTonalityAnalysisService:
             - `subjectivity_description` (str): A human-readable explanation of the subjectivity score.
             - `objective_sentiment_status` (str): A categorized label for the objective sentiment score.
             - `objective_sentiment_description` (str): A human-readable explanation of the objective sentiment score.
+            - `chunks` (list): Per-chunk scores, only in chunked mode with `SENTIMENT_INCLUDE_CHUNKS` enabled.
         """
-        logger.info(f"Performing sentiment analysis on the text")
+        logger.debug("Performing sentiment analysis on the text")
 
         cleared_text = re.sub(r"\s*\n\s*", " ", text)
-        if not await asyncio.to_thread(is_eng_text, cleared_text):
-            (cleared_text,) = await self.translator.translate_text(cleared_text)
+        chunks = None
+        if settings.SENTIMENT_CHUNKED and len(cleared_text) > settings.SENTIMENT_CHUNK_THRESHOLD:
+            polarity, subjectivity, chunks = await self._chunked_sentiment_scores(cleared_text)
+        else:
+            language = await asyncio.to_thread(detect_language, cleared_text)
+            if language != "en" and language not in self.native_languages:
+                cleared_text = await self.translator.translate_text(cleared_text)
+                if cleared_text is None:
+                    raise TranslationError(f"The {language} text could not be translated")
+                language = "en"
+
+            polarity, subjectivity = await self._score(cleared_text, language)
 
-        analysed_text = TextBlob(cleared_text)
-        polarity = analysed_text.sentiment.polarity
-        subjectivity = analysed_text.sentiment.subjectivity
         objective_sentiment_score = await self._calculate_objective_sentiment(polarity, subjectivity)
 
         analyse_data = await self._generate_status_and_description(polarity, subjectivity, objective_sentiment_score)
@@ -78,10 +319,64 @@ class TextTonalityAnalysisService:
             "objective_sentiment_score": objective_sentiment_score,
         }
         response.update(analyse_data)
+        if chunks is not None and settings.SENTIMENT_INCLUDE_CHUNKS:
+            response["chunks"] = chunks
 
-        logger.info(f"Sentiment analysis completed successfully")
+        logger.debug("Sentiment analysis completed successfully")
         return response
 
+    async def _chunked_sentiment_scores(self, text: str) -> Tuple[float, float, List[Dict]]:
+        """
+        Splits the text into sentence-aligned windows, translates (unless the language is scored natively)
+        and scores a sample of them in parallel, and combines the scores into a length-weighted aggregate.
+
+        :param text: The cleaned input text.
+        :return: A Tuple (`polarity`, `subjectivity`, `chunks`) where `chunks` is the per-window breakdown.
+        """
+
+        windows = list(split_into_windows([text], settings.SENTIMENT_CHUNK_SIZE))
+        sampled = sample_windows(windows, settings.SENTIMENT_MAX_CHUNKS)
+        logger.debug("Scoring %s of %s text chunks", len(sampled), len(windows))
+
+        texts = [window for _, window in sampled]
+        language = await asyncio.to_thread(detect_language, text)
+        if language != "en" and language not in self.native_languages:
+            texts = await self.translator.translate_many(texts)
+            if any(translation is None for translation in texts):
+                raise TranslationError(f"Some chunks of the {language} text could not be translated")
+            language = "en"
+
+        scores = await self._score_batches(texts, language)
+
+        weights = [len(window) for _, window in sampled]
+        polarity, subjectivity = weighted_average(scores, weights)
+        chunks = [
+            {"index": index, "length": weight, "polarity": score[0], "subjectivity": score[1]}
+            for (index, _), weight, score in zip(sampled, weights, scores)
+        ]
+        return polarity, subjectivity, chunks
+
+    @observe_stage("scoring")
+    async def _score(self, text: str, language: str = "en") -> Tuple[float, float]:
+        return await self.engine.run(score_sentiment, text, language)
+
+    @observe_stage("scoring")
+    async def _score_batches(self, texts: List[str], language: str = "en") -> List[Tuple[float, float]]:
+        """Spreads the texts over the process pool in one batch per worker."""
+
+        if not texts:
+            return []
+
+        batch_size = -(-len(texts) // self.engine.max_workers)
+        batches = [texts[start : start + batch_size] for start in range(0, len(texts), batch_size)]
+        return [
+            score
+            for batch_scores in await asyncio.gather(
+                *(self.engine.run(score_sentiment_batch, b, language) for b in batches)
+            )
+            for score in batch_scores
+        ]
+
     async def _generate_status_and_description(
         self, polarity_score, subjectivity_score, objective_sentiment_score
     ) -> Dict[str, str]:
@@ -100,18 +395,10 @@ class TextTonalityAnalysisService:
             - `objective_sentiment_description`: A description of the objective sentiment score.
         """
 
-        logger.info(f"Starting to generate status and description for sentiment scores")
-
-        def get_status(score, ranges):
-            logger.info(f"Calculating status for score: {score}")
-            return next((status for min_val, max_val, status in ranges if min_val <= score < max_val), None)
-
-        logger.info(f"Generating status and description for sentiment scores")
-        polarity_status = get_status(polarity_score, POLARITY_RANGES)
-        subjectivity_status = get_status(subjectivity_score, SUBJECTIVITY_RANGES)
-        objective_sentiment_status = get_status(objective_sentiment_score, OBJECTIVE_SENTIMENT_RANGES)
+        polarity_status = _status_for(polarity_score, POLARITY_RANGES)
+        subjectivity_status = _status_for(subjectivity_score, SUBJECTIVITY_RANGES)
+        objective_sentiment_status = _status_for(objective_sentiment_score, OBJECTIVE_SENTIMENT_RANGES)
 
-        logger.info(f"Status and description generated successfully")
         return {
             "polarity_status": polarity_status.value,
             "polarity_description": POLARITY_DESCRIPTIONS.get(polarity_status.name),
@@ -131,12 +418,12 @@ class TextTonalityAnalysisService:
                  stronger objective sentiment.
         """
 
-        logger.info(f"Calculating objective sentiment score")
+        logger.debug("Calculating objective sentiment score")
         if subjectivity_score == 1:
             return 0.0
 
         adjusted_polarity = abs(polarity_score) ** 0.8
         adjusted_subjectivity = 1 - subjectivity_score**2
 
-        logger.info(f"Objective sentiment score calculated successfully")
+        logger.debug("Objective sentiment score calculated successfully")
         return adjusted_polarity * adjusted_subjectivity
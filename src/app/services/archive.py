@@ -0,0 +1,62 @@
+import posixpath
+import tarfile
+import zipfile
+from typing import BinaryIO, Callable, Iterator, NamedTuple
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+DOCUMENT_SUFFIXES = (".txt", ".docx", ".pdf")
+
+
+class ArchiveEntry(NamedTuple):
+    name: str
+    size: int
+    # Reads at most `limit` bytes of the entry. Entries of a tar stream must be read before the next one is requested.
+    read: Callable[[int], bytes]
+
+
+def is_archive(name: str) -> bool:
+    return name.endswith(ARCHIVE_SUFFIXES)
+
+
+def is_document(name: str) -> bool:
+    """Whether an archive entry is a supported document, excluding metadata files such as `__MACOSX/._report.pdf`."""
+
+    return name.endswith(DOCUMENT_SUFFIXES) and not (
+        name.startswith("__MACOSX/") or posixpath.basename(name).startswith("._")
+    )
+
+
+def _read_zip_entry(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> bytes:
+    with archive.open(info) as entry:
+        return entry.read(limit)
+
+
+def _read_tar_entry(archive: tarfile.TarFile, member: tarfile.TarInfo, limit: int) -> bytes:
+    with archive.extractfile(member) as entry:
+        return entry.read(limit)
+
+
+def iter_archive_entries(file_obj: BinaryIO, name: str) -> Iterator[ArchiveEntry]:
+    """
+    Lists the regular files of a ZIP or (optionally compressed) tar archive without extracting them.
+    ZIP entries come from the central directory; tar archives are read as a stream, in a single pass.
+
+    :param file_obj: Archive content. ZIP archives need a seekable file.
+    :param name: Archive name, its extension selects the format.
+    :return: An iterator of entries in archive order. Blocking, so it is driven from a thread.
+    """
+
+    file_obj.seek(0)
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(file_obj) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    yield ArchiveEntry(
+                        info.filename, info.file_size, lambda limit, i=info: _read_zip_entry(archive, i, limit)
+                    )
+        return
+
+    with tarfile.open(fileobj=file_obj, mode="r|*") as archive:
+        for member in archive:
+            if member.isfile():
+                yield ArchiveEntry(member.name, member.size, lambda limit, m=member: _read_tar_entry(archive, m, limit))
@@ -0,0 +1,235 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.settings.config import settings, logger
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CallbackOutbox:
+    """
+    Keeps undelivered callback payloads in a local SQLite database, so they survive restarts.
+    Several processes can share the database: an entry is claimed before it is redelivered,
+    so only one of them sends it.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS callback_outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "callback_url TEXT NOT NULL, "
+            "payload TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, "
+            "claimed_until REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(callback_outbox)")}
+        if "claimed_until" not in columns:
+            self._connection.execute("ALTER TABLE callback_outbox ADD COLUMN claimed_until REAL NOT NULL DEFAULT 0")
+
+    def add(self, callback_url: str, payload: Dict) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO callback_outbox (callback_url, payload, created_at) VALUES (?, ?, ?)",
+                (callback_url, json.dumps(payload), time.time()),
+            )
+
+    def pending(self, limit: int = 100) -> List[Tuple[int, str, Dict, int, float]]:
+        """
+        :return: Up to `limit` unclaimed (`id`, `callback_url`, `payload`, `attempts`, `created_at`) rows,
+                 least tried first. A row has to be claimed before it is delivered.
+        """
+
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, callback_url, payload, attempts, created_at FROM callback_outbox "
+                "WHERE claimed_until <= ? ORDER BY attempts, id LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+        return [
+            (row_id, callback_url, json.loads(payload), attempts, created_at)
+            for row_id, callback_url, payload, attempts, created_at in rows
+        ]
+
+    def claim(self, row_id: int, lease: float) -> bool:
+        """
+        Claims a row for delivery, in a single conditional update, so no other process delivers it at the same time.
+
+        :param row_id: Row to claim.
+        :param lease: Seconds the claim lasts. A row claimed by a process that stopped is delivered again after it.
+        :return: `True` if the row was claimed, `False` if it is claimed by another process or was removed.
+        """
+
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE callback_outbox SET claimed_until = ? WHERE id = ? AND claimed_until <= ?",
+                (now + lease, row_id, now),
+            )
+        return cursor.rowcount == 1
+
+    def remove(self, row_id: int) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM callback_outbox WHERE id = ?", (row_id,))
+
+    def mark_attempt(self, row_id: int) -> None:
+        """Counts a failed delivery and releases the claim on the row."""
+
+        with self._lock:
+            self._connection.execute(
+                "UPDATE callback_outbox SET attempts = attempts + 1, claimed_until = 0 WHERE id = ?", (row_id,)
+            )
+
+
+class CallbackDispatcher:
+    """
+    Delivers callback payloads over long-lived, per-host connection pools (optionally HTTP/2).
+    Transient failures are retried with bounded exponential backoff, and payloads that still cannot be delivered
+    are stored in the outbox for a later replay. `httpx` clients are bound to an event loop,
+    so one dispatcher is created per loop. At most `CALLBACK_MAX_CLIENTS` clients are kept: the least recently used
+    one is closed when another host is called, as soon as no delivery is using it.
+    """
+
+    def __init__(self, outbox: Optional[CallbackOutbox]):
+        self.outbox = outbox
+        self._clients: OrderedDict[str, httpx.AsyncClient] = OrderedDict()
+        self._users: Dict[httpx.AsyncClient, int] = {}
+        self._evicted: Set[httpx.AsyncClient] = set()
+
+    async def deliver(self, callback_url: str, payload: Dict, use_outbox: bool = True) -> Optional[bool]:
+        """
+        Sends the payload to the callback URL.
+
+        :param callback_url: Callback URL of an external service.
+        :param payload: JSON-serializable payload.
+        :param use_outbox: Whether to store the payload in the outbox if all retries fail.
+        :return: `True` if delivered, `None` if deferred to the outbox, `False` if the receiver rejected it
+                 or it could not be stored.
+        :raises httpx.HTTPStatusError: If the receiver responds with a non-retryable error status.
+        """
+
+        client = await self._acquire_client(callback_url)
+        try:
+            for attempt in range(settings.CALLBACK_MAX_RETRIES + 1):
+                try:
+                    response = await client.post(callback_url, json=payload)
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        response.raise_for_status()
+                        return True
+                    logger.error(f"CallbackDispatcher: {callback_url} responded with {response.status_code}")
+                except httpx.TransportError as e:
+                    logger.error(f"CallbackDispatcher: Failed to reach {callback_url}: {str(e)}")
+
+                if attempt < settings.CALLBACK_MAX_RETRIES:
+                    delay = min(settings.CALLBACK_BACKOFF_MAX, settings.CALLBACK_BACKOFF_BASE * 2**attempt)
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+        finally:
+            await self._release_client(client)
+
+        if use_outbox and self.outbox is not None:
+            await asyncio.to_thread(self.outbox.add, callback_url, payload)
+            logger.error(f"CallbackDispatcher: Delivery to {callback_url} deferred to the outbox")
+            return None
+
+        return False
+
+    async def replay_outbox(self) -> None:
+        """
+        Retries every payload stored in the outbox once. Each payload is claimed first (for `CALLBACK_OUTBOX_LEASE`
+        seconds), so processes sharing the outbox skip the payloads another one is delivering. Payloads tried
+        `CALLBACK_OUTBOX_MAX_ATTEMPTS` times or older than `CALLBACK_OUTBOX_MAX_AGE` seconds are dropped.
+        """
+
+        if self.outbox is None:
+            return
+
+        now = time.time()
+        for row_id, callback_url, payload, attempts, created_at in await asyncio.to_thread(self.outbox.pending):
+            if not await asyncio.to_thread(self.outbox.claim, row_id, settings.CALLBACK_OUTBOX_LEASE):
+                continue
+
+            max_attempts, max_age = settings.CALLBACK_OUTBOX_MAX_ATTEMPTS, settings.CALLBACK_OUTBOX_MAX_AGE
+            if (max_attempts and attempts >= max_attempts) or (max_age and now - created_at > max_age):
+                logger.error(
+                    f"CallbackDispatcher: Dropping outbox entry {row_id} for {callback_url} "
+                    f"after {attempts} attempts over {now - created_at:.0f}s"
+                )
+                await asyncio.to_thread(self.outbox.remove, row_id)
+                continue
+
+            try:
+                delivered = await self.deliver(callback_url, payload, use_outbox=False)
+            except httpx.HTTPStatusError as e:
+                logger.error(f"CallbackDispatcher: Dropping outbox entry {row_id}: {str(e)}")
+                delivered = True
+
+            if delivered:
+                await asyncio.to_thread(self.outbox.remove, row_id)
+            else:
+                await asyncio.to_thread(self.outbox.mark_attempt, row_id)
+
+    async def run_outbox_replay(self) -> None:
+        while True:
+            try:
+                await self.replay_outbox()
+            except Exception as e:
+                logger.error(f"CallbackDispatcher: Outbox replay failed: {str(e)}")
+            await asyncio.sleep(settings.CALLBACK_OUTBOX_REPLAY_INTERVAL)
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values()) + list(self._evicted)
+        self._clients, self._evicted = OrderedDict(), set()
+        self._users.clear()
+        for client in clients:
+            await client.aclose()
+
+    async def _acquire_client(self, callback_url: str) -> httpx.AsyncClient:
+        """Returns the client of the callback host, to hand back with `_release_client`."""
+
+        url = urlsplit(callback_url)
+        origin = f"{url.scheme}://{url.netloc}"
+        client = self._clients.get(origin)
+        if client is not None:
+            self._clients.move_to_end(origin)
+        else:
+            client = httpx.AsyncClient(
+                http2=settings.CALLBACK_HTTP2,
+                timeout=settings.CALLBACK_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.CALLBACK_MAX_CONNECTIONS_PER_HOST,
+                    max_keepalive_connections=settings.CALLBACK_MAX_CONNECTIONS_PER_HOST,
+                    keepalive_expiry=settings.CALLBACK_KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._clients[origin] = client
+            while len(self._clients) > max(settings.CALLBACK_MAX_CLIENTS, 1):
+                _, evicted = self._clients.popitem(last=False)
+                if self._users.get(evicted):
+                    self._evicted.add(evicted)
+                else:
+                    await evicted.aclose()
+
+        self._users[client] = self._users.get(client, 0) + 1
+        return client
+
+    async def _release_client(self, client: httpx.AsyncClient) -> None:
+        users = self._users.pop(client, 1) - 1
+        if users > 0:
+            self._users[client] = users
+        elif client in self._evicted:
+            self._evicted.discard(client)
+            await client.aclose()
@@ -0,0 +1,76 @@
+import re
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+")
+
+
+def split_into_windows(segments: Iterable[str], window_size: int) -> Iterator[str]:
+    """
+    Groups sentences into windows of at most `window_size` characters.
+    Segments (pages, paragraphs) are consumed lazily; callers currently pass the whole extracted text as one segment.
+    A single sentence longer than the window is cut at the window size.
+
+    :param segments: Text segments in document order.
+    :param window_size: Maximum window length in characters.
+    :return: An iterator of sentence-aligned windows.
+    """
+
+    window: List[str] = []
+    length = 0
+    for segment in segments:
+        for sentence in SENTENCE_BOUNDARY.split(segment):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+
+            while len(sentence) > window_size:
+                if window:
+                    yield " ".join(window)
+                    window, length = [], 0
+                yield sentence[:window_size]
+                sentence = sentence[window_size:]
+
+            if length + len(sentence) + len(window) > window_size and window:
+                yield " ".join(window)
+                window, length = [], 0
+
+            window.append(sentence)
+            length += len(sentence)
+
+    if window:
+        yield " ".join(window)
+
+
+def sample_windows(windows: Sequence[str], max_windows: int) -> List[Tuple[int, str]]:
+    """
+    Picks at most `max_windows` windows spread evenly over the document.
+
+    :param windows: All windows of the document.
+    :param max_windows: Maximum number of windows to keep, `0` keeps all of them.
+    :return: A list of (`index`, `window`) pairs in document order.
+    """
+
+    if not max_windows or len(windows) <= max_windows:
+        return list(enumerate(windows))
+
+    step = len(windows) / max_windows
+    indexes = sorted({int(i * step + step / 2) for i in range(max_windows)})
+    return [(index, windows[index]) for index in indexes]
+
+
+def weighted_average(scores: Sequence[Tuple[float, float]], weights: Sequence[int]) -> Tuple[float, float]:
+    """
+    Combines per-window (polarity, subjectivity) pairs into a length-weighted aggregate.
+
+    :param scores: Per-window (polarity, subjectivity) pairs.
+    :param weights: Per-window lengths.
+    :return: The aggregated (polarity, subjectivity) pair.
+    """
+
+    total = sum(weights)
+    if not total:
+        return 0.0, 0.0
+
+    polarity = sum(score[0] * weight for score, weight in zip(scores, weights)) / total
+    subjectivity = sum(score[1] * weight for score, weight in zip(scores, weights)) / total
+    return polarity, subjectivity
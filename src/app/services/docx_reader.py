@@ -0,0 +1,108 @@
+import posixpath
+import zipfile
+from io import BytesIO
+from typing import IO, Iterator, List, Union
+
+from lxml import etree
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_PACKAGE_RELATIONSHIPS = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_RELATIONSHIP_TYPES = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+
+_PARAGRAPH = _W + "p"
+_RUN = _W + "r"
+_HYPERLINK = _W + "hyperlink"
+_TEXT = _W + "t"
+_BREAK = _W + "br"
+_BREAK_TYPE = _W + "type"
+# Run content with a fixed text equivalent, as in `python-docx`
+_RUN_SYMBOLS = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+# Paragraphs directly inside these elements are read: the document body, table cells, headers and footers.
+# Paragraphs in text boxes and content controls are skipped, like `python-docx` paragraphs do.
+_PARAGRAPH_CONTAINERS = {_W + "body", _W + "tc", _W + "hdr", _W + "ftr"}
+
+
+def _run_text(run: etree._Element) -> str:
+    parts = []
+    for child in run:
+        if child.tag == _TEXT:
+            parts.append(child.text or "")
+        elif child.tag == _BREAK:
+            parts.append("\n" if child.get(_BREAK_TYPE, "textWrapping") == "textWrapping" else "")
+        elif child.tag in _RUN_SYMBOLS:
+            parts.append(_RUN_SYMBOLS[child.tag])
+    return "".join(parts)
+
+
+def paragraph_text(paragraph: etree._Element) -> str:
+    """Text of a `w:p` element, built from its runs and hyperlinks the same way as `python-docx` `Paragraph.text`."""
+
+    parts = []
+    for child in paragraph:
+        if child.tag == _RUN:
+            parts.append(_run_text(child))
+        elif child.tag == _HYPERLINK:
+            parts.extend(_run_text(run) for run in child if run.tag == _RUN)
+    return "".join(parts)
+
+
+def iter_part_paragraphs(stream: IO[bytes]) -> Iterator[str]:
+    """
+    Incrementally parses a WordprocessingML part and yields the text of its non-blank paragraphs in document order.
+    Paragraphs are dropped from the tree once read, so memory stays flat for large documents.
+    """
+
+    for _, element in etree.iterparse(stream, events=("end",), tag=_PARAGRAPH, resolve_entities=False):
+        parent = element.getparent()
+        if parent is None or parent.tag not in _PARAGRAPH_CONTAINERS:
+            continue
+
+        text = paragraph_text(element)
+        if text.strip():
+            yield text
+
+        element.clear()
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def _relationship_targets(archive: zipfile.ZipFile, rels_path: str, source_dir: str, kind: str) -> List[str]:
+    try:
+        root = etree.fromstring(archive.read(rels_path), etree.XMLParser(resolve_entities=False))
+    except KeyError:
+        return []
+
+    targets = []
+    for relationship in root.iter(_PACKAGE_RELATIONSHIPS):
+        if relationship.get("Type") == _RELATIONSHIP_TYPES + kind and relationship.get("TargetMode") != "External":
+            target = relationship.get("Target", "")
+            path = target.lstrip("/") if target.startswith("/") else posixpath.join(source_dir, target)
+            targets.append(posixpath.normpath(path))
+    return targets
+
+
+def iter_docx_paragraphs(source: Union[bytes, str], include_headers_footers: bool = False) -> Iterator[str]:
+    """
+    Streams the text of the non-blank paragraphs of a DOCX document, including table cells,
+    straight from the zip archive without building the `python-docx` object model.
+
+    :param source: Document content, or the path of the document file.
+    :param include_headers_footers: Also yield header and footer paragraphs, after the body.
+    :return: An iterator of paragraph texts in document order.
+    """
+
+    with zipfile.ZipFile(BytesIO(source) if isinstance(source, bytes) else source) as archive:
+        documents = _relationship_targets(archive, "_rels/.rels", "", "officeDocument") or ["word/document.xml"]
+        document = documents[0]
+        with archive.open(document) as stream:
+            yield from iter_part_paragraphs(stream)
+
+        if not include_headers_footers:
+            return
+
+        document_dir, document_name = posixpath.split(document)
+        rels_path = posixpath.join(document_dir, "_rels", f"{document_name}.rels")
+        for kind in ("header", "footer"):
+            for part in _relationship_targets(archive, rels_path, document_dir, kind):
+                with archive.open(part) as stream:
+                    yield from iter_part_paragraphs(stream)
@@ -0,0 +1,145 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from langdetect.detector_factory import PROFILES_DIRECTORY, DetectorFactory
+from langdetect.lang_detect_exception import LangDetectException
+
+from src.settings.config import logger
+
+WORD_PATTERN = re.compile(r"[a-z']+")
+# Frequent function words that are rare outside English, used by the fast path.
+# fmt: off
+ENGLISH_FUNCTION_WORDS = frozenset((
+    "the", "and", "of", "to", "that", "for", "was", "with", "this", "are", "have", "you", "not",
+    "but", "they", "from", "it", "is", "be", "on", "his", "her", "which", "were", "been", "would",
+))
+# fmt: on
+LATIN_SCRIPT_END = 0x024F
+# Returned without the model for text written mostly in a non-Latin script (ISO 639 "undetermined").
+NON_LATIN = "und"
+
+
+class LanguageDetector:
+    """
+    Detects the language of a text before it is scored or sent to translation.
+
+    Obvious cases are decided from the text itself: text without letters and ASCII text dense in English function
+    words are English, and text written mostly in a non-Latin script is `NON_LATIN`, unless `identify_non_latin`
+    asks for its actual language (the multilingual mode needs it to pick a lexicon). The rest goes to `langdetect`,
+    whose profiles are loaded once and whose random sampling is seeded, so the same text always gets the same answer.
+    Both paths look at several spans spread over the document rather than its first characters, and answers are
+    memoized by text hash.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        spans: int,
+        span_length: int,
+        cache_size: int,
+        identify_non_latin: bool = False,
+        english_word_ratio: float = 0.2,
+        max_non_ascii_ratio: float = 0.02,
+        min_words: int = 8,
+    ):
+        self.seed = seed
+        self.spans = spans
+        self.span_length = span_length
+        self.cache_size = cache_size
+        self.identify_non_latin = identify_non_latin
+        self.english_word_ratio = english_word_ratio
+        self.max_non_ascii_ratio = max_non_ascii_ratio
+        self.min_words = min_words
+        self._factory: Optional[DetectorFactory] = None
+        self._cache: OrderedDict[bytes, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Loads the language profiles. Called once at startup; detection calls it lazily otherwise."""
+
+        with self._lock:
+            if self._factory is None:
+                factory = DetectorFactory()
+                factory.load_profile(PROFILES_DIRECTORY)
+                factory.set_seed(self.seed)
+                self._factory = factory
+                logger.info("LanguageDetector: Loaded %s language profiles", len(factory.get_lang_list()))
+
+    def language(self, text: str) -> str:
+        """
+        Detects the language of the text.
+
+        :param text: The text to check.
+        :return: A `langdetect` language code (`en`, `fr`, `zh-cn`, ...); `en` if the text has nothing to translate,
+                 `NON_LATIN` for text in a non-Latin script unless `identify_non_latin` is set.
+        """
+
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        sample = self._sample(text)
+        result = self._fast_path(sample) or self._detect(sample)
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return result
+
+    def _sample(self, text: str) -> str:
+        """Joins `spans` evenly spaced spans of the text, cut at word boundaries."""
+
+        if len(text) <= self.spans * self.span_length:
+            return text
+
+        step = (len(text) - self.span_length) / max(self.spans - 1, 1)
+        spans: List[str] = []
+        for index in range(self.spans):
+            start = int(index * step)
+            span = text[start : start + self.span_length]
+            if start:
+                span = span.partition(" ")[2]
+            spans.append(span.rpartition(" ")[0] or span)
+
+        return " ".join(spans)
+
+    def _fast_path(self, sample: str) -> Optional[str]:
+        """Decides obvious cases without the model, or returns `None`."""
+
+        letters = [char for char in sample if char.isalpha()]
+        if not letters:
+            return "en"
+
+        non_latin = sum(1 for char in letters if ord(char) > LATIN_SCRIPT_END)
+        if non_latin * 2 >= len(letters):
+            return None if self.identify_non_latin else NON_LATIN
+
+        non_ascii = sum(1 for char in letters if not char.isascii())
+        if non_ascii > self.max_non_ascii_ratio * len(letters):
+            return None
+
+        words = WORD_PATTERN.findall(sample.lower())
+        if len(words) < self.min_words:
+            return None
+
+        function_words = sum(1 for word in words if word in ENGLISH_FUNCTION_WORDS)
+        return "en" if function_words >= self.english_word_ratio * len(words) else None
+
+    def _detect(self, sample: str) -> str:
+        if self._factory is None:
+            self.load()
+
+        detector = self._factory.create()
+        detector.append(sample)
+        try:
+            return detector.detect()
+        except LangDetectException as e:
+            logger.error(f"LanguageDetector: {str(e)}")
+            return "en"
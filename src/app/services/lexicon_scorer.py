@@ -0,0 +1,219 @@
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Mirrors the punctuation, negations and emoticons of TextBlob's pattern-based analyzer.
+PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+QUOTES = "'‘’“”\""
+NEGATIONS = frozenset(("no", "not", "n't", "never"))
+
+# Token flags of the code table.
+KNOWN = 1
+MODIFIER = 2
+NEGATION = 4
+RESETS_NEGATION = 8
+RESETS_MODIFIER = 16
+EXCLAMATION = 32
+SARCASM = 64
+EMOTICON = 128
+ENDS_WITH_LY = 256
+SPECIAL = MODIFIER | NEGATION | EXCLAMATION | SARCASM | EMOTICON
+
+
+def _emoticons() -> Dict[str, float]:
+    from textblob._text import EMOTICONS
+
+    return {emoticon: polarity for (_, polarity), group in EMOTICONS.items() for emoticon in group}
+
+
+def _token_pattern(emoticons: Sequence[str]) -> re.Pattern:
+    """
+    Builds one regex that reproduces the token stream of TextBlob's tokenizer: quotes and leading/trailing
+    punctuation are split from words, abbreviations keep their period, and sarcasm marks and emoticons
+    (which TextBlob re-joins after splitting) are single tokens.
+    """
+
+    from textblob._text import ABBREVIATIONS
+
+    punctuation = re.escape(PUNCTUATION)
+    quotes = re.escape(QUOTES)
+    emoticon_alternatives = "|".join(
+        r"\s?".join(re.escape(char) for char in emoticon) for emoticon in sorted(emoticons, key=len, reverse=True)
+    )
+    abbreviations = "|".join(re.escape(abbreviation) for abbreviation in sorted(ABBREVIATIONS, key=len, reverse=True))
+    chunk_end = rf"(?=[{punctuation}]*(?:[\s{quotes}]|$))"
+    return re.compile(
+        rf"\(\s?!\s?\)"
+        rf"|(?:{emoticon_alternatives})(?:(?=\s|$)|(?<=[{punctuation}]))(?!\s?!\s?\))"
+        rf"|(?:(?:{abbreviations})(?!\.\.)|(?:(?:[A-Za-z]\.)+|[A-Z][bcdfghjklmnpqrstvwxz|]+\.)(?!\.)){chunk_end}"
+        rf"|\.*[^\s{punctuation}{quotes}](?:[^\s{quotes}]*[^\s{punctuation}{quotes}])?"
+        rf"|\.\.\."
+        rf"|[{punctuation}{quotes}]"
+    )
+
+
+class LexiconSentimentScorer:
+    """
+    Scores polarity and subjectivity with TextBlob's pattern lexicon, precompiled into NumPy lookup tables.
+
+    Text is tokenized with one compiled regex pass, every distinct token is mapped once to an integer code
+    (lexicon id plus flags for modifiers, negations, exclamation marks, sarcasm marks and emoticons),
+    and documents are scored in a batch. Documents without modifiers, negations or marks are averaged
+    with vectorized `bincount` reductions; the others go through a single pass over their integer codes
+    that applies TextBlob's intensifier and negation rules.
+    """
+
+    def __init__(self):
+        from textblob.en import sentiment as pattern_sentiment
+
+        _ = "good" in pattern_sentiment  # the lexicon is loaded lazily
+        lexicon = dict.items(pattern_sentiment)
+        words = [word for word, _ in lexicon]
+        scores = np.array([tags[None] for _, tags in lexicon], dtype=np.float64).reshape(-1, 3)
+
+        self._word_ids = {word: index for index, word in enumerate(words)}
+        self._polarity = scores[:, 0]
+        self._subjectivity = scores[:, 1]
+        self._intensity = scores[:, 2]
+        self._is_modifier = np.array(
+            [any(tag in pattern_sentiment.modifiers for tag in tags if tag) for _, tags in lexicon], dtype=bool
+        )
+        emoticons = _emoticons()
+        self._emoticons = {emoticon.lower(): polarity for emoticon, polarity in emoticons.items()}
+        self._token_pattern = _token_pattern(list(emoticons))
+        self._codes: Dict[str, Tuple[int, int, float]] = {}
+
+    def score(self, text: str) -> Tuple[float, float]:
+        return self.score_batch([text])[0]
+
+    def score_batch(self, texts: Sequence[str]) -> List[Tuple[float, float]]:
+        """
+        Scores several documents at once.
+
+        :param texts: Documents to score.
+        :return: A list of (`polarity`, `subjectivity`) pairs, one per document.
+        """
+
+        polarity_sums = np.zeros(len(texts))
+        subjectivity_sums = np.zeros(len(texts))
+        counts = np.zeros(len(texts))
+
+        plain_docs, plain_ids = [], []
+        for doc_index, text in enumerate(texts):
+            codes = [self._code(token) for token in self._tokenize(text)]
+            flags = np.fromiter((code[1] for code in codes), dtype=np.int32, count=len(codes))
+            if not (flags & SPECIAL).any():
+                ids = np.fromiter((code[0] for code in codes), dtype=np.int64, count=len(codes))
+                known_ids = ids[(flags & KNOWN) != 0]
+                plain_docs.append(np.full(len(known_ids), doc_index))
+                plain_ids.append(known_ids)
+                continue
+
+            polarities, subjectivities = self._assess(codes)
+            polarity_sums[doc_index] = sum(polarities)
+            subjectivity_sums[doc_index] = sum(subjectivities)
+            counts[doc_index] = len(polarities)
+
+        if plain_ids:
+            docs = np.concatenate(plain_docs).astype(np.int64)
+            ids = np.concatenate(plain_ids)
+            polarity_sums += np.bincount(docs, weights=self._polarity[ids], minlength=len(texts))
+            subjectivity_sums += np.bincount(docs, weights=self._subjectivity[ids], minlength=len(texts))
+            counts += np.bincount(docs, minlength=len(texts))
+
+        divisors = np.maximum(counts, 1)
+        return list(zip((polarity_sums / divisors).tolist(), (subjectivity_sums / divisors).tolist()))
+
+    def _tokenize(self, text: str) -> List[str]:
+        return self._token_pattern.findall(text.replace("n't", " n't"))
+
+    def _code(self, token: str) -> Tuple[int, int, float]:
+        """Returns the (lexicon id, flags, emoticon polarity) code of a token, computed once per distinct token."""
+
+        code = self._codes.get(token)
+        if code is not None:
+            return code
+
+        raw_token, token = token, "".join(token.split()).lower()
+        word_id = self._word_ids.get(token, -1)
+        flags = 0
+        if word_id >= 0:
+            flags |= KNOWN
+            if self._is_modifier[word_id]:
+                flags |= MODIFIER
+        if token in NEGATIONS:
+            flags |= NEGATION
+        if len(token.strip("'")) > 1:
+            flags |= RESETS_NEGATION
+        if len(token) > 2:
+            flags |= RESETS_MODIFIER
+        if token == "!":
+            flags |= EXCLAMATION
+        if token == "(!)":
+            flags |= SARCASM
+        if token.endswith("ly"):
+            flags |= ENDS_WITH_LY
+        emoticon = self._emoticons.get(token)
+        if emoticon is not None and word_id < 0 and not token.isalpha() and len(token) <= 5:
+            flags |= EMOTICON
+
+        code = (word_id, flags, emoticon or 0.0)
+        if len(self._codes) < 1_000_000:
+            self._codes[raw_token] = code
+        return code
+
+    def _assess(self, codes: List[Tuple[int, int, float]]) -> Tuple[List[float], List[float]]:
+        """Applies TextBlob's modifier, negation and exclamation rules to one document."""
+
+        polarity, subjectivity, intensity, negated = [], [], [], []
+        modifier_flags = None
+        negation = False
+        for word_id, flags, emoticon in codes:
+            if flags & KNOWN:
+                p = self._polarity[word_id]
+                s = self._subjectivity[word_id]
+                i = self._intensity[word_id]
+                if modifier_flags is None:
+                    polarity.append(p)
+                    subjectivity.append(s)
+                    intensity.append(i)
+                    negated.append(False)
+                else:
+                    polarity[-1] = max(-1.0, min(p * intensity[-1], 1.0))
+                    subjectivity[-1] = max(-1.0, min(s * intensity[-1], 1.0))
+                    intensity[-1] = i
+                if negation:
+                    intensity[-1] = 1.0 / intensity[-1]
+                    negated[-1] = True
+
+                modifier_flags = flags if flags & MODIFIER else None
+                negation = bool(flags & NEGATION)
+                continue
+
+            if flags & NEGATION:
+                negation = True
+            elif negation and flags & RESETS_NEGATION:
+                negation = False
+
+            if negation and modifier_flags is not None and modifier_flags & ENDS_WITH_LY:
+                negated[-1] = True
+                negation = False
+            elif modifier_flags is not None and flags & RESETS_MODIFIER:
+                modifier_flags = None
+
+            if flags & EXCLAMATION and polarity:
+                polarity[-1] = max(-1.0, min(polarity[-1] * 1.25, 1.0))
+            if flags & SARCASM:
+                polarity.append(0.0)
+                subjectivity.append(1.0)
+                intensity.append(1.0)
+                negated.append(False)
+            if flags & EMOTICON:
+                polarity.append(emoticon)
+                subjectivity.append(1.0)
+                intensity.append(1.0)
+                negated.append(False)
+
+        polarity = [p * -0.5 if n else p for p, n in zip(polarity, negated)]
+        return polarity, subjectivity
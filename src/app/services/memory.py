@@ -0,0 +1,137 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+from src.app.metrics import ADMISSION_REJECTIONS, ADMISSION_RESERVED_BYTES, ADMISSION_WAITING
+
+
+class MemoryBudget:
+    """
+    A budget of bytes shared by concurrent tasks of one event loop. `acquire` waits until enough of it is free.
+    A request larger than the whole budget takes all of it, so it still runs, alone.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.used = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, size: int) -> int:
+        """
+        :param size: Bytes needed.
+        :return: Bytes actually taken from the budget, to pass to `release`.
+        """
+
+        size = min(size, self.capacity)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.used + size <= self.capacity)
+            self.used += size
+        return size
+
+    async def release(self, size: int) -> None:
+        async with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+
+class AdmissionRejected(Exception):
+    """No memory budget became free in time for the job."""
+
+
+class _Waiter:
+    __slots__ = ("size", "loop", "future", "granted")
+
+    def __init__(self, size: int, loop: asyncio.AbstractEventLoop):
+        self.size = size
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """
+    A process-wide budget of bytes for the documents being analysed, shared by every event loop (the HTTP app,
+    the SQS consumer thread). Each job reserves an estimate of its peak memory before it downloads the document
+    and releases it when it finishes. Waiting jobs are admitted in arrival order.
+    """
+
+    def __init__(self, capacity: int, multiplier: float, default_estimate: int, archive_budget: int):
+        self.capacity = capacity
+        self.multiplier = multiplier
+        self.default_estimate = default_estimate
+        self.archive_budget = archive_budget
+        self.used = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        ADMISSION_RESERVED_BYTES.set_function(lambda: self.used)
+        ADMISSION_WAITING.set_function(lambda: len(self._waiters))
+
+    def estimate(self, size: Optional[int], archive: bool = False) -> int:
+        """
+        :param size: Document size in bytes, `None` if unknown.
+        :param archive: Whether the document is an archive. Its entries are analysed in memory, within a budget
+                        of `archive_budget` bytes (see `MemoryBudget`), which is reserved with the archive itself,
+                        so a job never waits for more budget while holding some.
+        :return: Bytes to reserve: the size times the number of copies a job holds (raw, buffered and decoded text).
+        """
+
+        estimate = self.default_estimate if size is None else int(size * self.multiplier)
+        return estimate + self.archive_budget if archive else estimate
+
+    async def acquire(self, size: int, timeout: Optional[float] = None) -> int:
+        """
+        Waits until `size` bytes are free and reserves them. A reservation larger than the whole budget takes all of it.
+
+        :param size: Bytes to reserve, see `estimate`.
+        :param timeout: Seconds to wait, `None` waits as long as it takes.
+        :return: Bytes actually reserved, to pass to `release`.
+        :raises AdmissionRejected: If the budget did not free up within `timeout`.
+        """
+
+        size = min(max(size, 1), self.capacity)
+        with self._lock:
+            if not self._waiters and self.used + size <= self.capacity:
+                self.used += size
+                return size
+            waiter = _Waiter(size, asyncio.get_running_loop())
+            self._waiters.append(waiter)
+
+        try:
+            async with asyncio.timeout(timeout):
+                await waiter.future
+            return size
+        except BaseException as error:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+                    self._admit_waiters()
+            if granted:
+                self.release(size)
+            if isinstance(error, TimeoutError):
+                ADMISSION_REJECTIONS.inc()
+                raise AdmissionRejected(f"No memory budget for {size} bytes within {timeout}s") from None
+            raise
+
+    def release(self, size: int) -> None:
+        with self._lock:
+            self.used -= size
+            self._admit_waiters()
+
+    def _admit_waiters(self) -> None:
+        """Admits waiters from the head of the queue while they fit. Called with the lock held."""
+
+        while self._waiters and self.used + self._waiters[0].size <= self.capacity:
+            waiter = self._waiters.popleft()
+            try:
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+            except RuntimeError:
+                continue  # the loop of the waiter is closed
+            waiter.granted = True
+            self.used += waiter.size
@@ -0,0 +1,92 @@
+import os
+import threading
+from typing import Dict, Tuple
+
+from src.settings.config import logger
+
+LEXICON_SUFFIX = "-sentiment.xml"
+
+# Negation words, the part-of-speech tags of the words that intensify the next one, and the suffixes of the adverbs
+# that do so (like English "-ly"), per language. The `fr` and `nl` rules are those of the `pattern` library.
+# fmt: off
+LANGUAGE_RULES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]] = {
+    "de": (("nicht", "nie", "niemals", "kein", "keine", "keinen", "keiner"), ("RB",), ()),
+    "es": (("no", "nunca", "jamás", "tampoco"), ("RB",), ("mente",)),
+    "fr": (("n'", "ne", "ni", "non", "pas", "rien", "sans", "aucun", "jamais"), ("RB",), ("ment",)),
+    "it": (("non", "mai"), ("RB",), ("mente",)),
+    "nl": (("geen", "gene", "ni", "niet", "nooit"), ("JJ", "RB"), ("ig", "isch", "lijk")),
+    "pt": (("não", "nunca", "jamais"), ("RB",), ("mente",)),
+}
+# fmt: on
+
+
+def find_lexicons(directory: str) -> Dict[str, str]:
+    """
+    Lists the sentiment lexicons of a directory. English is left out: it is always scored by `SENTIMENT_ENGINE`.
+
+    :param directory: Directory of lexicons named `<language>-sentiment.xml`, in the XML format of TextBlob's
+                      `en-sentiment.xml` (the lexicons of the `pattern` library can be used as they are).
+    :return: A dictionary of lexicon paths by language code, empty if the directory is not set or does not exist.
+    """
+
+    if not directory or not os.path.isdir(directory):
+        return {}
+
+    return {
+        name[: -len(LEXICON_SUFFIX)]: os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.endswith(LEXICON_SUFFIX) and name != f"en{LEXICON_SUFFIX}"
+    }
+
+
+class MultilingualSentimentScorer:
+    """
+    Scores polarity and subjectivity of non-English text directly, with the lexicon of its language and the
+    same pattern-based rules TextBlob applies to English, so documents in these languages need no translation.
+    Each lexicon is parsed once per process.
+    """
+
+    def __init__(self, lexicons: Dict[str, str]):
+        self.lexicons = lexicons
+        self._analyzers = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Parses every lexicon. Called once per worker at startup; scoring loads them lazily otherwise."""
+
+        for language in self.lexicons:
+            self._analyzer(language)
+
+    def score(self, text: str, language: str) -> Tuple[float, float]:
+        """
+        :param text: Text written in `language`.
+        :param language: Language code with a lexicon.
+        :return: A (`polarity`, `subjectivity`) pair.
+        """
+
+        polarity, subjectivity = self._analyzer(language)(text)[:2]
+        return polarity, subjectivity
+
+    def _analyzer(self, language: str):
+        analyzer = self._analyzers.get(language)
+        if analyzer is not None:
+            return analyzer
+
+        from textblob._text import Sentiment
+
+        negations, modifiers, modifier_suffixes = LANGUAGE_RULES.get(language, ((), ("RB",), ()))
+        with self._lock:
+            analyzer = self._analyzers.get(language)
+            if analyzer is None:
+                analyzer = Sentiment(
+                    path=self.lexicons[language],
+                    language=language,
+                    negations=negations,
+                    modifiers=modifiers,
+                    modifier=lambda word: bool(modifier_suffixes) and word.endswith(modifier_suffixes),
+                )
+                _ = "" in analyzer  # the lexicon is loaded lazily
+                self._analyzers[language] = analyzer
+                logger.info("MultilingualSentimentScorer: Loaded %s words of the %s lexicon", len(analyzer), language)
+
+        return analyzer
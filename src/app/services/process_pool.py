@@ -0,0 +1,89 @@
+import asyncio
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from src.settings.config import logger
+
+
+def _warm_up_worker() -> None:
+    """
+    Imports the heavy extraction and scoring libraries once per worker instead of on the first job.
+    Interrupts are ignored: the owning process shuts the pool down after draining its jobs.
+    """
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import fitz  # noqa: F401
+    import src.app.services.docx_reader  # noqa: F401
+    from src.app.services.analysis import load_native_lexicons, score_sentiment
+
+    score_sentiment("warm up")
+    load_native_lexicons()
+
+
+def _noop() -> None:
+    return None
+
+
+class ProcessPoolEngine:
+    """
+    A process-wide pool for CPU-bound stages (text extraction, sentiment scoring).
+    Workers are started on `start()`, warmed up, and recycled after `max_tasks_per_child` jobs.
+    The executor is thread-safe, so the HTTP event loop and the SQS thread share the same workers.
+    """
+
+    def __init__(self, max_workers: int, max_tasks_per_child: int):
+        self.max_workers = max(1, max_workers)
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        executor = self._get_executor()
+        for future in [executor.submit(_noop) for _ in range(self.max_workers)]:
+            future.result()
+
+        logger.info("ProcessPoolEngine: %s workers are ready", self.max_workers)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Runs `func(*args)` in a worker process without blocking the event loop.
+
+        :param func: A picklable module-level function.
+        :param args: Picklable arguments, e.g. `bytes` or `str`.
+        :return: The function result.
+        """
+
+        executor = self._get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            logger.error(f"ProcessPoolEngine: The pool is broken, it will be recreated on the next job")
+            self._reset(executor)
+            raise
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up_worker,
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
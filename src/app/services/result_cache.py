@@ -0,0 +1,153 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.settings.config import logger, settings
+
+CACHE_VERSION = "2"
+
+# Settings that change the analysis result. They are part of every key, so a config change never serves stale results.
+RESULT_SETTINGS = (
+    "DOCX_INCLUDE_HEADERS_FOOTERS",
+    "PDF_MAX_PAGES",
+    "PDF_MAX_CHARS",
+    "TXT_MAX_CHARS",
+    "TXT_FALLBACK_ENCODING",
+    "SENTIMENT_ENGINE",
+    "SENTIMENT_CHUNKED",
+    "SENTIMENT_CHUNK_THRESHOLD",
+    "SENTIMENT_CHUNK_SIZE",
+    "SENTIMENT_MAX_CHUNKS",
+    "SENTIMENT_INCLUDE_CHUNKS",
+    "SENTIMENT_MULTILINGUAL",
+    "SENTIMENT_LEXICON_DIR",
+)
+
+
+def _key_prefix() -> str:
+    profile = repr([getattr(settings, name) for name in RESULT_SETTINGS]).encode("utf-8")
+    return f"v{CACHE_VERSION}:{hashlib.sha256(profile).hexdigest()[:12]}"
+
+
+def text_cache_key(text: str) -> str:
+    return f"{_key_prefix()}:text:{hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()}"
+
+
+def object_cache_key(s3_key: str, etag: str) -> str:
+    etag = etag.strip('"')
+    return f"{_key_prefix()}:object:{etag}:{s3_key}"
+
+
+class DiskCacheTier:
+    """Stores results as JSON files and evicts the least recently used files once `max_bytes` is exceeded."""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+    def get(self, key: str) -> Optional[Dict]:
+        file_path = self._file_path(key)
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                value = json.load(file)
+            os.utime(file_path)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Dict) -> None:
+        file_path = self._file_path(key)
+        data = json.dumps(value).encode("utf-8")
+        with self._lock:
+            try:
+                previous_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+                fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+                with os.fdopen(fd, "wb") as file:
+                    file.write(data)
+                os.replace(tmp_path, file_path)
+                self._size += len(data) - previous_size
+            except OSError as e:
+                logger.error(f"DiskCacheTier: Failed to write cache entry: {str(e)}")
+                return
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(
+            (entry for entry in os.scandir(self.path) if entry.is_file() and entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        target = int(self.max_bytes * 0.9)
+        for entry in entries:
+            if self._size <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._size -= size
+            except OSError:
+                continue
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json")
+
+
+class ResultCache:
+    """
+    Two-tier cache of analysis results: a bounded in-memory LRU in front of an optional on-disk tier.
+    Values are copied on the way in and out, so callers may mutate what they get back.
+    """
+
+    def __init__(self, max_entries: int, disk_path: str = "", disk_max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.disk = DiskCacheTier(disk_path, disk_max_bytes) if disk_path else None
+        self._memory: OrderedDict[str, Dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    async def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return copy.deepcopy(value)
+
+        if self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Dict) -> None:
+        value = copy.deepcopy(value)
+        self._remember(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "memory_entries": len(self._memory)}
+
+    def _remember(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import BinaryIO, Dict, List, Optional
+
+GROUP_COLUMNS = ("status", "polarity_status", "subjectivity_status", "objective_sentiment_status")
+_SCORE_COLUMNS = ("polarity", "subjectivity", "objective_sentiment_score") + GROUP_COLUMNS[1:]
+
+
+def content_sha256(file_obj: BinaryIO) -> str:
+    """Hashes a document without reading it into memory at once. Blocking, so it is run in a thread."""
+
+    file_obj.seek(0)
+    digest = hashlib.file_digest(file_obj, "sha256").hexdigest()
+    file_obj.seek(0)
+    return digest
+
+
+class ResultStore:
+    """
+    Keeps every analysis result in a local SQLite database, indexed by document key and time,
+    so results can be read again and aggregated without reprocessing the documents.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_results ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "s3_key TEXT NOT NULL, "
+            "content_hash TEXT, "
+            "etag TEXT, "
+            "status TEXT NOT NULL, "
+            "polarity REAL, "
+            "subjectivity REAL, "
+            "objective_sentiment_score REAL, "
+            "polarity_status TEXT, "
+            "subjectivity_status TEXT, "
+            "objective_sentiment_status TEXT, "
+            "result TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS analysis_results_key ON analysis_results (s3_key, created_at)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS analysis_results_hash ON analysis_results (content_hash, created_at)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS analysis_results_time ON analysis_results (created_at, status)"
+        )
+
+    def add(
+        self, s3_key: str, status: str, result: Dict, content_hash: Optional[str] = None, etag: Optional[str] = None
+    ) -> None:
+        """
+        :param s3_key: Document key or storage URI, as requested.
+        :param status: Status of the analysis, `success` or `error`.
+        :param result: The result sent to the callback: sentiment metrics, or a `message` on errors.
+        :param content_hash: SHA-256 of the document, `None` if the result was served from the result cache.
+                             It is then taken from an earlier result of the same document and `etag`.
+        :param etag: Storage version of the document, if known.
+        """
+
+        scores = [result.get(column) for column in _SCORE_COLUMNS]
+        with self._lock:
+            if content_hash is None and etag is not None:
+                row = self._connection.execute(
+                    "SELECT content_hash FROM analysis_results WHERE s3_key = ? AND etag = ? "
+                    "AND content_hash IS NOT NULL ORDER BY created_at DESC LIMIT 1",
+                    (s3_key, etag),
+                ).fetchone()
+                content_hash = row[0] if row is not None else None
+            self._connection.execute(
+                "INSERT INTO analysis_results (s3_key, content_hash, etag, status, polarity, subjectivity, "
+                "objective_sentiment_score, polarity_status, subjectivity_status, objective_sentiment_status, "
+                "result, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (s3_key, content_hash, etag, status, *scores, json.dumps(result), time.time()),
+            )
+
+    def latest(self, s3_key: str, content_hash: Optional[str] = None) -> Optional[Dict]:
+        """
+        :param s3_key: Document key or storage URI, as requested.
+        :param content_hash: Only consider results of this version of the document.
+        :return: The most recent result of the document, or `None`.
+        """
+
+        query = "SELECT s3_key, content_hash, etag, status, result, created_at FROM analysis_results WHERE s3_key = ?"
+        parameters = [s3_key]
+        if content_hash is not None:
+            query += " AND content_hash = ?"
+            parameters.append(content_hash)
+
+        with self._lock:
+            row = self._connection.execute(query + " ORDER BY created_at DESC, id DESC LIMIT 1", parameters).fetchone()
+        if row is None:
+            return None
+
+        s3_key, content_hash, etag, status, result, created_at = row
+        return {
+            "s3_key": s3_key,
+            "content_hash": content_hash,
+            "etag": etag,
+            "status": status,
+            "created_at": created_at,
+            "result": json.loads(result),
+        }
+
+    def aggregate(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        status: Optional[str] = None,
+        key_prefix: Optional[str] = None,
+        group_by: str = "status",
+    ) -> List[Dict]:
+        """
+        Counts results and averages their scores per group.
+
+        :param since: Start of the time range (Unix time, inclusive).
+        :param until: End of the time range (Unix time, exclusive).
+        :param status: Only count results with this status.
+        :param key_prefix: Only count documents whose key starts with this prefix.
+        :param group_by: One of `GROUP_COLUMNS`.
+        :return: One dictionary per group with `count` and the average `polarity`, `subjectivity` and
+                 `objective_sentiment_score`, in group order. Averages are `None` for groups of errors only.
+        """
+
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group by {group_by!r}")
+
+        conditions, parameters = [], []
+        if since is not None:
+            conditions.append("created_at >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("created_at < ?")
+            parameters.append(until)
+        if status is not None:
+            conditions.append("status = ?")
+            parameters.append(status)
+        if key_prefix:
+            escaped = key_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append("s3_key LIKE ? ESCAPE '\\'")
+            parameters.append(f"{escaped}%")
+
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        query = (
+            f"SELECT {group_by}, COUNT(*), AVG(polarity), AVG(subjectivity), AVG(objective_sentiment_score) "
+            f"FROM analysis_results {where}GROUP BY {group_by} ORDER BY {group_by}"
+        )
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+
+        return [
+            {
+                group_by: group,
+                "count": count,
+                "polarity": polarity,
+                "subjectivity": subjectivity,
+                "objective_sentiment_score": objective_sentiment_score,
+            }
+            for group, count, polarity, subjectivity, objective_sentiment_score in rows
+        ]
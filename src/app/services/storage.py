@@ -0,0 +1,202 @@
+import hashlib
+import os
+import re
+import threading
+from io import BytesIO
+from typing import BinaryIO, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+_LOCATION_PATTERN = re.compile(r"^([a-z][a-z0-9+.-]*)://(.*)$")
+
+
+class ObjectInfo(NamedTuple):
+    # A value that changes whenever the object changes, `None` if the store has none
+    etag: Optional[str]
+    size: Optional[int]
+
+
+class StorageError(Exception):
+    """The document location cannot be read: unknown scheme, missing object, or an error of the store."""
+
+
+class StorageBackend:
+    """
+    Reads documents from a store. Methods are blocking and run on the download thread pool.
+    """
+
+    # `True` if `open` returns a network stream that has to be copied locally before extraction,
+    # `False` if it returns a seekable file that can be handed to the extractor as it is.
+    streaming = False
+
+    def open(self, key: str) -> Tuple[BinaryIO, int]:
+        """
+        :param key: Object key within the store.
+        :return: A Tuple (readable file, size in bytes). The caller must close the file.
+        """
+
+        raise NotImplementedError
+
+    def head(self, key: str) -> ObjectInfo:
+        """
+        :param key: Object key within the store.
+        :return: The object metadata, read without its content.
+        """
+
+        raise NotImplementedError
+
+
+class S3StorageBackend(StorageBackend):
+    streaming = True
+
+    def __init__(self, client, bucket: str):
+        self.client = client
+        self.bucket = bucket
+
+    def open(self, key: str) -> Tuple[BinaryIO, int]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=key)
+        except (BotoCoreError, ClientError) as e:
+            raise StorageError(str(e)) from e
+        return response["Body"], response.get("ContentLength", 0)
+
+    def head(self, key: str) -> ObjectInfo:
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=key)
+            return ObjectInfo(response.get("ETag"), response.get("ContentLength"))
+        except (BotoCoreError, ClientError) as e:
+            raise StorageError(str(e)) from e
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files under a root directory. Keys that resolve outside of the root are rejected."""
+
+    def __init__(self, root: str):
+        self.root = os.path.realpath(root)
+
+    def open(self, key: str) -> Tuple[BinaryIO, int]:
+        try:
+            file_obj = open(self._path(key), "rb")
+        except OSError as e:
+            raise StorageError(str(e)) from e
+        return file_obj, os.fstat(file_obj.fileno()).st_size
+
+    def head(self, key: str) -> ObjectInfo:
+        try:
+            stat = os.stat(self._path(key))
+        except OSError as e:
+            raise StorageError(str(e)) from e
+        return ObjectInfo(f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"', stat.st_size)
+
+    def _path(self, key: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, key.lstrip("/")))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise StorageError(f"{key} is outside of the storage root")
+        return path
+
+
+class MemoryStorageBackend(StorageBackend):
+    """Objects kept in process memory, for benchmarks, tests and single-process deployments."""
+
+    def __init__(self):
+        self._objects: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._objects[key] = data
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._objects.pop(key, None)
+
+    def open(self, key: str) -> Tuple[BinaryIO, int]:
+        data = self._get(key)
+        return BytesIO(data), len(data)
+
+    def head(self, key: str) -> ObjectInfo:
+        data = self._get(key)
+        return ObjectInfo(f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"', len(data))
+
+    def _get(self, key: str) -> bytes:
+        with self._lock:
+            data = self._objects.get(key)
+        if data is None:
+            raise StorageError(f"{key} not found")
+        return data
+
+
+class Storage:
+    """
+    Resolves document locations to a backend and a key.
+
+    A plain key (e.g. `reports/q1.pdf`) is read from the default backend. A URI picks the backend by its scheme:
+    `s3://bucket/key` (only for the allowed buckets), `file://key` (relative to the local storage root)
+    and `memory://key`.
+    """
+
+    def __init__(
+        self,
+        default: StorageBackend,
+        s3_buckets: Dict[str, StorageBackend],
+        local: Optional[StorageBackend] = None,
+        memory: Optional[MemoryStorageBackend] = None,
+    ):
+        self.default = default
+        self.s3_buckets = s3_buckets
+        self.local = local
+        self.memory = memory
+
+    def resolve(self, location: str) -> Tuple[StorageBackend, str]:
+        """
+        :param location: A plain key or a storage URI.
+        :return: A Tuple (backend, key within the backend).
+        :raises StorageError: If the scheme is unknown or not enabled, or the S3 bucket is not allowed.
+        """
+
+        match = _LOCATION_PATTERN.match(location)
+        if match is None:
+            return self.default, location
+
+        scheme, path = match.groups()
+        backend = None
+        if scheme == "s3":
+            bucket, _, path = path.partition("/")
+            backend = self.s3_buckets.get(bucket)
+        elif scheme == "file":
+            backend = self.local
+        elif scheme == "memory":
+            backend = self.memory
+
+        if backend is None or not path:
+            raise StorageError(f"Unsupported storage location: {location}")
+        return backend, path
+
+
+def create_storage(backend: str, s3_client, s3_buckets: Iterable[str], default_bucket: str, local_root: str) -> Storage:
+    """
+    Builds the storage from settings.
+
+    :param backend: Default backend for plain keys: `s3`, `local` or `memory`.
+    :param s3_client: boto3 S3 client.
+    :param s3_buckets: Buckets that `s3://` locations may read from, besides the default bucket.
+    :param default_bucket: Bucket of plain keys when the default backend is `s3`.
+    :param local_root: Root directory of `file://` locations and of the `local` backend. Empty disables them.
+    """
+
+    buckets = {bucket: S3StorageBackend(s3_client, bucket) for bucket in {default_bucket, *s3_buckets} if bucket}
+    local = LocalStorageBackend(local_root) if local_root else None
+    memory = MemoryStorageBackend()
+
+    if backend == "s3":
+        default = buckets[default_bucket]
+    elif backend == "local":
+        if local is None:
+            raise ValueError("STORAGE_BACKEND=local requires STORAGE_LOCAL_ROOT")
+        default = local
+    elif backend == "memory":
+        default = memory
+    else:
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    return Storage(default, buckets, local=local, memory=memory)
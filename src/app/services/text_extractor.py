@@ -1,19 +1,107 @@
+import asyncio
+import os
+import tempfile
 from io import BytesIO
-from typing import Tuple, Union
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
 
 import fitz
-from docx import Document
 
-from src.settings.config import logger
+from src.app.metrics import observe_stage
+from src.app.services import get_process_pool_engine
+from src.app.services.docx_reader import iter_docx_paragraphs
+from src.app.services.txt_reader import read_text
+from src.settings.config import logger, settings
+
+
+def file_source(file_bytes: BinaryIO) -> Union[bytes, str]:
+    """
+    Picks the cheapest form of a downloaded file to hand to a worker process: the buffer of an in-memory file,
+    the path of a file on disk, or the content of any other file object (e.g. an upload spooled to an unnamed file).
+    """
+
+    if isinstance(file_bytes, BytesIO):
+        return file_bytes.getvalue()
+    name = getattr(file_bytes, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name
+    file_bytes.seek(0)
+    return file_bytes.read()
+
+
+def extract_text_from_docx(source: Union[bytes, str], include_headers_footers: bool = False) -> str:
+    """Runs in a worker process. Joins all non-empty paragraphs of a DOCX document, including table cells."""
+
+    return " ".join(iter_docx_paragraphs(source, include_headers_footers))
+
+
+def open_pdf(source: Union[bytes, str]) -> fitz.Document:
+    return fitz.open(stream=source, filetype="pdf") if isinstance(source, bytes) else fitz.open(source)
+
+
+def pdf_page_count(source: Union[bytes, str]) -> int:
+    with open_pdf(source) as doc:
+        return doc.page_count
+
+
+def iter_pdf_page_texts(doc: fitz.Document, start: int, stop: int) -> Iterator[str]:
+    """
+    Yields the text of pages `start`..`stop - 1` in order. Pages that reference no fonts (scans, images, blank pages)
+    have no text to extract and are skipped without being laid out.
+    """
+
+    for number in range(start, stop):
+        page = doc.load_page(number)
+        if not page.get_fonts():
+            continue
+        text = page.get_text()
+        if text.strip():
+            yield text
+
+
+def extract_text_from_pdf(
+    source: Union[bytes, str], start: int = 0, stop: Optional[int] = None, max_chars: int = 0
+) -> str:
+    """
+    Runs in a worker process. Joins the text of a range of pages of a PDF document.
+
+    :param source: Document content, or the path of the document file.
+    :param start: First page.
+    :param stop: Page after the last one, `None` reads to the end.
+    :param max_chars: Stop reading pages once the text has this many characters, 0 reads them all.
+    :return: The text, at most `max_chars` characters long.
+    """
+
+    with open_pdf(source) as doc:
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        pages, length = [], 0
+        for text in iter_pdf_page_texts(doc, start, stop):
+            pages.append(text)
+            length += len(text) + 1
+            if max_chars and length >= max_chars:
+                break
+        return " ".join(pages)[: max_chars or None]
+
+
+def pdf_page_ranges(pages: int, workers: int, min_pages: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """Splits a document into page ranges for the process pool; documents under `min_pages` pages stay whole."""
+
+    if workers <= 1 or pages < min_pages:
+        return [(0, pages)]
+    step = max(1, pages_per_task)
+    return [(start, min(start + step, pages)) for start in range(0, pages, step)]
 
 
 class TextExtractorService:
+    def __init__(self):
+        self.engine = get_process_pool_engine()
+
+    @observe_stage("extraction")
     async def extract_text(self, s3_key, file_bytes) -> Tuple[Union[str, None], bool]:
         """
         Extracts text from a file bytes steam based on the file extension.
 
-        :param s3_key: File name (or key) in the S3 bucket.
-        :param file_bytes: File content as a BytesIO object.
+        :param s3_key: File name, key or storage URI of the document, its extension selects the extractor.
+        :param file_bytes: File content as a BytesIO object, a local or temporary file, or an upload.
         :return:
         """
 
@@ -30,61 +118,116 @@ class TextExtractorService:
 
         return "Unsupported file type", False
 
-    async def _extract_text_from_txt(self, file_bytes: BytesIO) -> Tuple[Union[str, None], bool]:
+    async def _extract_text_from_txt(self, file_bytes: BinaryIO) -> Tuple[Union[str, None], bool]:
         """
-        Extracts text from a text file.
+        Extracts text from a text file in a thread, decoding it in `TXT_CHUNK_SIZE` chunks with the encoding sniffed
+        from its first bytes. At most `TXT_MAX_CHARS` characters are read.
 
-        :param file_bytes: File content as a BytesIO object.
+        :param file_bytes: File content as a BytesIO object or a temporary file.
         :return:
             - Tuple (`str`, `True`) if the text is extracted successfully.
             - Tuple (`None`, `False`) if an error occurs.
         """
 
         try:
-            logger.info(f"Extracting text from TXT file")
-            return file_bytes.getvalue().decode("utf-8"), True
+            logger.debug("Extracting text from TXT file")
+            text = await asyncio.to_thread(
+                read_text,
+                file_bytes,
+                settings.TXT_CHUNK_SIZE,
+                settings.TXT_MAX_CHARS,
+                settings.TXT_FALLBACK_ENCODING,
+            )
+            return text, True
         except Exception as e:
             logger.error(f"TextExtractorService {str(e)}")
             return None, False
 
-    async def _extract_text_from_docx(self, file_bytes: BytesIO) -> Tuple[Union[str, None], bool]:
+    async def _extract_text_from_docx(self, file_bytes: BinaryIO) -> Tuple[Union[str, None], bool]:
         """
-        Extracts text from a DOCX file bytes using the `python-docx` library.
+        Extracts text from a DOCX file bytes in the process pool, streaming the document XML from the archive.
 
-        :param file_bytes:  File content as a BytesIO object.
+        :param file_bytes: File content as a BytesIO object or a temporary file.
         :return:
             - Tuple (`str`, `True`) if the text is extracted successfully.
             - Tuple (`None`, `False`) if an error occurs.
         """
 
         try:
-            logger.info(f"Starting text extraction from DOCX file")
-            doc = Document(file_bytes)
-            result = " ".join([para.text for para in doc.paragraphs if para.text.strip()])
+            logger.debug("Starting text extraction from DOCX file")
+            result = await self.engine.run(
+                extract_text_from_docx, file_source(file_bytes), settings.DOCX_INCLUDE_HEADERS_FOOTERS
+            )
 
-            logger.info(f"Text extracted successfully")
+            logger.debug("Text extracted successfully")
             return result, True
         except Exception as e:
             logger.error(f"TextExtractorService {str(e)}")
             return None, False
 
-    async def _extract_text_from_pdf(self, file_bytes: BytesIO) -> Tuple[Union[str, None], bool]:
+    async def _extract_text_from_pdf(self, file_bytes: BinaryIO) -> Tuple[Union[str, None], bool]:
         """
-        Extracts text from a PDF file bytes using the `PyMuPDF` library.
+        Extracts text from a PDF file bytes using the `PyMuPDF` library in the process pool.
+        Documents of `PDF_PARALLEL_MIN_PAGES` pages or more are split into ranges of `PDF_PAGES_PER_TASK` pages
+        that are extracted in parallel. At most `PDF_MAX_PAGES` pages and `PDF_MAX_CHARS` characters are read.
 
-        :param file_bytes: File content as a BytesIO object.
+        :param file_bytes: File content as a BytesIO object or a temporary file.
         :return:
             - Tuple (`str`, `True`) if the text is extracted successfully.
             - Tuple (`None`, `False`) if an error occurs
         """
 
         try:
-            logger.info(f"Starting text extraction from PDF file")
-            doc = fitz.open("pdf", file_bytes.read())
-            result = " ".join([page.get_text() for page in doc.pages()])
-
-            logger.info(f"Text extracted successfully")
+            logger.debug("Starting text extraction from PDF file")
+            source = file_source(file_bytes)
+            pages = await asyncio.to_thread(pdf_page_count, source)
+            if settings.PDF_MAX_PAGES and pages > settings.PDF_MAX_PAGES:
+                logger.warning("PDF has %s pages, only the first %s are read", pages, settings.PDF_MAX_PAGES)
+                pages = settings.PDF_MAX_PAGES
+
+            ranges = pdf_page_ranges(
+                pages, self.engine.max_workers, settings.PDF_PARALLEL_MIN_PAGES, settings.PDF_PAGES_PER_TASK
+            )
+            if len(ranges) == 1:
+                result = await self.engine.run(extract_text_from_pdf, source, 0, pages, settings.PDF_MAX_CHARS)
+            elif isinstance(source, bytes):
+                # Workers open the document by path instead of each receiving a copy of the bytes
+                with tempfile.NamedTemporaryFile(dir=settings.S3_SPOOL_DIR or None, suffix=".pdf") as spooled:
+                    await asyncio.to_thread(spooled.write, source)
+                    await asyncio.to_thread(spooled.flush)
+                    result = await self._extract_pdf_ranges(spooled.name, ranges)
+            else:
+                result = await self._extract_pdf_ranges(source, ranges)
+
+            logger.debug("Text extracted successfully")
             return result, True
         except Exception as e:
             logger.error(f"TextExtractorService {str(e)}")
             return None, False
+
+    async def _extract_pdf_ranges(self, path: str, ranges: List[Tuple[int, int]]) -> str:
+        """
+        Extracts page ranges in parallel and joins them in page order as they complete.
+        Once `PDF_MAX_CHARS` characters are collected, the ranges that have not started are cancelled.
+        """
+
+        max_chars = settings.PDF_MAX_CHARS
+        tasks = [
+            asyncio.create_task(self.engine.run(extract_text_from_pdf, path, start, stop, max_chars))
+            for start, stop in ranges
+        ]
+        parts, length = [], 0
+        try:
+            for task in tasks:
+                text = await task
+                if text:
+                    parts.append(text)
+                    length += len(text) + 1
+                if max_chars and length >= max_chars:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        return " ".join(parts)[: max_chars or None]
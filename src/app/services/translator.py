@@ -1,32 +1,220 @@
+import asyncio
+import hashlib
+import importlib
 import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import List, Optional
 
 from googletrans import Translator
 
-from src.settings.config import logger
+from src.app.metrics import observe_stage
+from src.app.services.chunking import split_into_windows
+from src.settings.config import logger, settings
 
+CLEANING_PATTERN = re.compile(r"\s*[\n\t\r\b]\s*")
+
+
+def clean_text(text: str) -> str:
+    return CLEANING_PATTERN.sub(" ", text)
+
+
+class TranslationError(Exception):
+    """The text could not be translated, so it cannot be scored in English."""
+
+
+class TranslationBackend:
+    """Translates one chunk of text. Implementations must be safe to call concurrently."""
+
+    async def translate(self, text: str, dest: str) -> str:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        return None
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """The `googletrans` HTTP client is bound to an event loop, so one translator is kept per loop."""
 
-class TranslatorService:
     def __init__(self):
-        self.translator = Translator()
+        self._translators = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    async def translate(self, text: str, dest: str) -> str:
+        result = await self._translator().translate(text, dest=dest)
+        return result.text
+
+    async def aclose(self) -> None:
+        with self._lock:
+            translator = self._translators.pop(asyncio.get_running_loop(), None)
+        if translator is not None:
+            await translator.client.aclose()
+
+    def _translator(self) -> Translator:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            translator = self._translators.get(loop)
+            if translator is None:
+                translator = self._translators[loop] = Translator()
+        return translator
+
+
+class LocalTranslationBackend(TranslationBackend):
+    """Offline stand-in that returns the text unchanged after an optional delay. Used for benchmarks."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def translate(self, text: str, dest: str) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return text
+
+
+def create_translation_backend(name: str) -> TranslationBackend:
+    """
+    Creates a translation backend by name.
+
+    :param name: `google`, `local`, or the `module:ClassName` path of a custom `TranslationBackend`,
+                 e.g. an offline model.
+    :return: A backend instance.
+    """
+
+    if name == "google":
+        return GoogleTranslateBackend()
+    if name == "local":
+        return LocalTranslationBackend()
+
+    module_name, _, class_name = name.partition(":")
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class()
+
+
+class TranslationCache:
+    """Thread-safe LRU of chunk translations keyed by a hash of the chunk and the target language."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, dest: str) -> bytes:
+        return hashlib.blake2b(f"{dest}\0{text}".encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: bytes, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RateLimiter:
+    """
+    Spaces out requests to at most `rate` per second across all threads and event loops.
+    Slots are reserved under a thread lock and waited for with `asyncio.sleep`, so the limiter is not bound to a loop.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class TranslatorService:
+    """
+    Translates documents chunk by chunk: the text is split into sentence-aligned chunks of bounded size,
+    the chunks are translated concurrently under a concurrency cap and a rate limit, and the translations are
+    reassembled in order. Chunk translations are cached, so repeated passages are translated once.
+    """
+
+    def __init__(self, backend: TranslationBackend, cache: Optional[TranslationCache], rate_limiter: RateLimiter):
+        self.backend = backend
+        self.cache = cache
+        self.rate_limiter = rate_limiter
         self.to_lang = "en"
-        self.text = ""
 
-    async def translate_text(self, text: str) -> str | None:
-        self.text = text
-        cleaned_text = await self.clean_text()
+    async def translate_text(self, text: str) -> Optional[str]:
+        """
+        Translates a document into English.
+
+        :param text: The text to translate.
+        :return: The translated text, or `None` if any of its chunks could not be translated.
+        """
+
+        (translated,) = await self.translate_many([text])
+        return translated
+
+    @observe_stage("translation")
+    async def translate_many(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        Translates several documents, sharing one concurrency cap across all of their chunks.
+
+        :param texts: The texts to translate.
+        :return: The translations in input order; `None` for a text any of whose chunks could not be translated,
+                 so a partial translation is never scored.
+        """
+
+        chunked = [list(split_into_windows([clean_text(text)], settings.TRANSLATION_CHUNK_SIZE)) for text in texts]
+        semaphore = asyncio.Semaphore(settings.TRANSLATION_CONCURRENCY)
+
+        async def translate(chunk: str) -> Optional[str]:
+            async with semaphore:
+                return await self._translate_chunk(chunk)
+
+        results = await asyncio.gather(*(translate(chunk) for chunks in chunked for chunk in chunks))
+
+        translations, position = [], 0
+        for chunks in chunked:
+            translated = results[position : position + len(chunks)]
+            position += len(chunks)
+            if any(result is None for result in translated):
+                translations.append(None)
+                continue
+            translations.append(" ".join(translated))
+
+        logger.debug("Translated %s chunks of %s texts", position, len(texts))
+        return translations
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+    async def _translate_chunk(self, chunk: str) -> Optional[str]:
+        key = TranslationCache.key(chunk, self.to_lang)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
 
         try:
-            result = await self.translator.translate(cleaned_text, dest=self.to_lang)
-            logger.info(f"Text translated successfully")
-            return result.text
+            await self.rate_limiter.wait()
+            result = await self.backend.translate(chunk, self.to_lang)
         except Exception as e:
             logger.error(f"TranslatorService {str(e)}")
             return None
 
-    async def clean_text(self) -> str:
-        cleaning_args = ["\n", "\t", "\r", "\b"]
-        for arg in cleaning_args:
-            self.text = re.sub(rf"\s*{re.escape(arg)}\s*", " ", self.text)
-
-        logger.info(f"Text cleaned successfully")
-        return self.text
+        if self.cache is not None:
+            self.cache.set(key, result)
+        return result
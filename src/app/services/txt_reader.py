@@ -0,0 +1,83 @@
+import codecs
+from typing import BinaryIO, Iterator
+
+SNIFF_SIZE = 64 * 1024
+
+# UTF-32 LE must be checked before UTF-16 LE, its BOM starts with the same two bytes
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_ASCII = bytes(range(128))
+_NOT_ASCII_LETTERS = bytes(byte for byte in range(256) if not chr(byte).isascii() or not chr(byte).isalpha())
+
+
+def sniff_encoding(prefix: bytes, fallback: str) -> str:
+    """
+    Guesses the encoding of a text file from its first bytes: a BOM, the zero bytes of BOM-less UTF-16,
+    valid UTF-8, or a prefix whose letters are almost all non-ASCII, which is typical of Cyrillic CP1251.
+
+    :param prefix: The first bytes of the file.
+    :param fallback: Single-byte encoding used when nothing else matches, e.g. `cp1252`.
+    :return: A codec name.
+    """
+
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+
+    half = len(prefix) // 2
+    if half:
+        even_zeros, odd_zeros = prefix[0::2].count(0), prefix[1::2].count(0)
+        if odd_zeros > 0.3 * half and even_zeros < 0.05 * half:
+            return "utf-16-le"
+        if even_zeros > 0.3 * half and odd_zeros < 0.05 * half:
+            return "utf-16-be"
+
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    non_ascii = len(prefix.translate(None, _ASCII))
+    ascii_letters = len(prefix.translate(None, _NOT_ASCII_LETTERS))
+    if non_ascii > 2 * ascii_letters:
+        return "cp1251"
+    return fallback
+
+
+def iter_text(file_obj: BinaryIO, chunk_size: int, max_chars: int, fallback: str) -> Iterator[str]:
+    """
+    Decodes a text file incrementally, one chunk at a time, so memory does not grow with the file size.
+    Undecodable bytes are replaced instead of failing the whole file.
+
+    :param file_obj: File content, read from the start.
+    :param chunk_size: Bytes read per chunk.
+    :param max_chars: Stop after this many characters, 0 reads the whole file.
+    :param fallback: Encoding used when the content is neither Unicode nor Cyrillic, see `sniff_encoding`.
+    :return: An iterator of decoded text chunks.
+    """
+
+    file_obj.seek(0)
+    chunk = file_obj.read(SNIFF_SIZE)
+    decoder = codecs.getincrementaldecoder(sniff_encoding(chunk, fallback))(errors="replace")
+    remaining = max_chars or None
+
+    while True:
+        text = decoder.decode(chunk, final=not chunk)
+        if remaining is not None:
+            text = text[:remaining]
+            remaining -= len(text)
+        if text:
+            yield text
+        if not chunk or remaining == 0:
+            return
+        chunk = file_obj.read(chunk_size)
+
+
+def read_text(file_obj: BinaryIO, chunk_size: int, max_chars: int, fallback: str) -> str:
+    return "".join(iter_text(file_obj, chunk_size, max_chars, fallback))
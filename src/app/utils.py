@@ -1,16 +1,20 @@
 from typing import Dict
 
 import httpx
-from langdetect import detect
-
+from src.app.metrics import observe_stage
+from src.app.models.res_statuses import Status
+from src.app.services import get_callback_dispatcher, get_language_detector
 from src.settings.config import logger
 
 
+@observe_stage("callback")
 async def callback(callback_url: str, status: str, data: Dict) -> Dict:
     """
     Function to send the data to the external service.
     Response data is a dictionary with data on the result of the function work
     in which the status passed after the completion of the file processing functions is added.
+    Delivery goes through the pooled callback dispatcher, which retries transient failures
+    and keeps undelivered results in the outbox.
 
     :param callback_url: callback URL of an external service
     :param status: status of the process - success, processing, waiting, error etc.
@@ -19,24 +23,34 @@ async def callback(callback_url: str, status: str, data: Dict) -> Dict:
              Statuses: success, processing, waiting, error etc.
     """
 
-    async with httpx.AsyncClient() as client:
-        try:
-            data["status"] = status
-            response = await client.post(callback_url, json=data)
-            response.raise_for_status()
+    dispatcher = get_callback_dispatcher()
+    try:
+        data["status"] = status
+        delivered = await dispatcher.deliver(callback_url, data)
+        if delivered:
             return {"status": status}
+        if delivered is None:
+            return {"status": Status.WAITING.value, "message": "Callback: Delivery deferred to the outbox"}
+        return {"status": "error", "message": "Callback: Delivery failed"}
+
+    except TypeError:
+        logger.error(f"Type error | Data format: {type(data)}, while dict was expected.")
+        await _report_callback_error(dispatcher, callback_url, "Type error during response data generation")
+        return {"status": "error", "message": "Callback: Type error"}
+
+    except Exception as e:
+        logger.error(e)
+        await _report_callback_error(dispatcher, callback_url, str(e))
+        return {"status": "error", "message": "Callback: Unexpected error"}
 
-        except TypeError:
-            logger.error(f"Type error | Data format: {type(data)}, while dict was expected.")
-            await client.post(callback_url, json={"error": "Type error during response data generation"})
-            return {"status": "error", "message": "Callback: Type error"}
 
-        except Exception as e:
-            logger.error(e)
-            await client.post(callback_url, json={"error": str(e)})
-            return {"status": "error", "message": "Callback: Unexpected error"}
+async def _report_callback_error(dispatcher, callback_url: str, error: str) -> None:
+    try:
+        await dispatcher.deliver(callback_url, {"error": error}, use_outbox=False)
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to report the callback error: {str(e)}")
 
 
-def is_eng_text(text: str) -> bool:
-    part_of_text = text[0:100] if len(text) > 100 else text
-    return True if detect(part_of_text) == "en" else False
+@observe_stage("language_detection")
+def detect_language(text: str) -> str:
+    return get_language_detector().language(text)
@@ -1,17 +1,23 @@
 import logging
-import platform
+import os
 
-from colorama import Fore, Style, init
 from decouple import config
 from pydantic_settings import BaseSettings
 
-if platform.system() == "Windows":
-    init(autoreset=True)
+from src.settings.log import configure_logging
 
 
 class Settings(BaseSettings):
     SECRET_KEY: str = config("SECRET_KEY", "mock-secret-key")
 
+    # Logging settings
+    LOG_LEVEL: str = config("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = config("LOG_FORMAT", "text")  # text | json
+    LOG_COLOR: str = config("LOG_COLOR", "auto")  # auto colors TTY output only | always | never
+
+    # Local state settings
+    DATA_DIR: str = config("DATA_DIR", "data")  # must be writable, holds the SQLite databases
+
     # AWS settings
     AWS_ACCESS_KEY_ID: str = config("AWS_ACCESS_KEY_ID", "mock-access-key")
     AWS_SECRET_ACCESS_KEY: str = config("AWS_SECRET_ACCESS_KEY", "mock-secret-key")
@@ -19,26 +25,128 @@ class Settings(BaseSettings):
     AWS_S3_REGION: str = config("AWS_S3_REGION", "eu-north-1")
     AWS_SQS_QUEUE_URL: str = config("AWS_SQS_QUEUE_URL", "mock-queue-url")
 
+    # S3 download settings
+    S3_MAX_POOL_CONNECTIONS: int = config("S3_MAX_POOL_CONNECTIONS", 50, cast=int)
+    S3_DOWNLOAD_WORKERS: int = config("S3_DOWNLOAD_WORKERS", 16, cast=int)
+    S3_DOWNLOAD_CHUNK_SIZE: int = config("S3_DOWNLOAD_CHUNK_SIZE", 1024 * 1024, cast=int)
+    S3_SPOOL_THRESHOLD: int = config("S3_SPOOL_THRESHOLD", 16 * 1024 * 1024, cast=int)
+    S3_SPOOL_DIR: str = config("S3_SPOOL_DIR", "")  # empty uses the system temp directory
+    S3_MAX_OBJECT_SIZE: int = config("S3_MAX_OBJECT_SIZE", 512 * 1024 * 1024, cast=int)
 
-# Logger settings
-class ColorLogFormatter(logging.Formatter):
-    COLORS = {
-        logging.DEBUG: Fore.BLUE,
-        logging.INFO: Fore.GREEN,
-        logging.WARNING: Fore.LIGHTYELLOW_EX,
-        logging.ERROR: Fore.RED,
-        logging.CRITICAL: Fore.RED + Style.BRIGHT,
-    }
+    # Storage settings
+    STORAGE_BACKEND: str = config("STORAGE_BACKEND", "s3")  # s3 | local | memory, used for plain keys
+    STORAGE_LOCAL_ROOT: str = config("STORAGE_LOCAL_ROOT", "")  # root of file:// locations, empty disables them
+    STORAGE_S3_BUCKETS: str = config("STORAGE_S3_BUCKETS", "")  # comma-separated buckets s3:// locations may use
+    UPLOAD_MAX_SIZE: int = config("UPLOAD_MAX_SIZE", 50 * 1024 * 1024, cast=int)
 
-    def format(self, record: logging.LogRecord) -> str:
-        color = self.COLORS.get(record.levelno, "")
-        message = super().format(record)
-        return f"{color}{message}{Style.RESET_ALL}"
+    # SQS consumer settings
+    SQS_MAX_IN_FLIGHT: int = config("SQS_MAX_IN_FLIGHT", 20, cast=int)
+    SQS_WAIT_TIME_SECONDS: int = config("SQS_WAIT_TIME_SECONDS", 20, cast=int)
+    SQS_VISIBILITY_TIMEOUT: int = config("SQS_VISIBILITY_TIMEOUT", 30, cast=int)
+    SQS_DELETE_BATCH_SIZE: int = config("SQS_DELETE_BATCH_SIZE", 10, cast=int)
+    SQS_DELETE_FLUSH_INTERVAL: float = config("SQS_DELETE_FLUSH_INTERVAL", 0.5, cast=float)
+    SQS_HEARTBEAT_INTERVAL: float = config("SQS_HEARTBEAT_INTERVAL", 10.0, cast=float)
+    SQS_MAX_VISIBILITY_EXTENSION: int = config("SQS_MAX_VISIBILITY_EXTENSION", 3600, cast=int)
+    SQS_DEDUPE_BACKEND: str = config("SQS_DEDUPE_BACKEND", "memory")  # memory | sqlite
+    SQS_DEDUPE_SQLITE_PATH: str = config("SQS_DEDUPE_SQLITE_PATH", os.path.join(DATA_DIR, "sqs_dedupe.sqlite3"))
+    SQS_DEDUPE_TTL: int = config("SQS_DEDUPE_TTL", 86400, cast=int)
+    SQS_DEDUPE_MAX_ENTRIES: int = config("SQS_DEDUPE_MAX_ENTRIES", 100000, cast=int)
+    SQS_DRAIN_TIMEOUT: float = config("SQS_DRAIN_TIMEOUT", 60.0, cast=float)
+    SQS_EMBEDDED_CONSUMER: bool = config("SQS_EMBEDDED_CONSUMER", True, cast=bool)  # consume in the web app
 
+    # Worker settings
+    WORKER_PROCESSES: int = config("WORKER_PROCESSES", 1, cast=int)
+    METRICS_WORKER_PORT: int = config("METRICS_WORKER_PORT", 0, cast=int)  # 0 disables worker metrics servers
+
+    # Process pool settings
+    PROCESS_POOL_WORKERS: int = config("PROCESS_POOL_WORKERS", os.cpu_count() or 1, cast=int)
+    PROCESS_POOL_MAX_TASKS_PER_CHILD: int = config("PROCESS_POOL_MAX_TASKS_PER_CHILD", 200, cast=int)
+
+    # Extraction settings
+    DOCX_INCLUDE_HEADERS_FOOTERS: bool = config("DOCX_INCLUDE_HEADERS_FOOTERS", False, cast=bool)
+    PDF_MAX_PAGES: int = config("PDF_MAX_PAGES", 2000, cast=int)  # 0 reads every page
+    PDF_MAX_CHARS: int = config("PDF_MAX_CHARS", 5_000_000, cast=int)  # 0 disables the limit
+    PDF_PARALLEL_MIN_PAGES: int = config("PDF_PARALLEL_MIN_PAGES", 64, cast=int)
+    PDF_PAGES_PER_TASK: int = config("PDF_PAGES_PER_TASK", 32, cast=int)
+    TXT_CHUNK_SIZE: int = config("TXT_CHUNK_SIZE", 1024 * 1024, cast=int)
+    TXT_MAX_CHARS: int = config("TXT_MAX_CHARS", 5_000_000, cast=int)  # 0 disables the limit
+    TXT_FALLBACK_ENCODING: str = config("TXT_FALLBACK_ENCODING", "cp1252")  # for files that are not UTF-8/16/32
+
+    # Sentiment analysis settings
+    SENTIMENT_ENGINE: str = config("SENTIMENT_ENGINE", "textblob")  # textblob | lexicon
+    SENTIMENT_CHUNKED: bool = config("SENTIMENT_CHUNKED", False, cast=bool)
+    SENTIMENT_CHUNK_THRESHOLD: int = config("SENTIMENT_CHUNK_THRESHOLD", 20000, cast=int)
+    SENTIMENT_CHUNK_SIZE: int = config("SENTIMENT_CHUNK_SIZE", 4000, cast=int)
+    SENTIMENT_MAX_CHUNKS: int = config("SENTIMENT_MAX_CHUNKS", 200, cast=int)  # 0 scores every chunk
+    SENTIMENT_INCLUDE_CHUNKS: bool = config("SENTIMENT_INCLUDE_CHUNKS", False, cast=bool)
+    SENTIMENT_MULTILINGUAL: bool = config("SENTIMENT_MULTILINGUAL", False, cast=bool)
+    SENTIMENT_LEXICON_DIR: str = config("SENTIMENT_LEXICON_DIR", "lexicons")  # <language>-sentiment.xml lexicons
+
+    # Translation settings
+    TRANSLATION_BACKEND: str = config("TRANSLATION_BACKEND", "google")  # google | local | module:ClassName
+    TRANSLATION_CHUNK_SIZE: int = config("TRANSLATION_CHUNK_SIZE", 2000, cast=int)
+    TRANSLATION_CONCURRENCY: int = config("TRANSLATION_CONCURRENCY", 4, cast=int)
+    TRANSLATION_RATE_LIMIT: float = config("TRANSLATION_RATE_LIMIT", 10.0, cast=float)  # requests/s, 0 disables it
+    TRANSLATION_CACHE_MAX_ENTRIES: int = config("TRANSLATION_CACHE_MAX_ENTRIES", 4096, cast=int)  # 0 disables it
+
+    # Language detection settings
+    LANGUAGE_DETECTION_SEED: int = config("LANGUAGE_DETECTION_SEED", 0, cast=int)
+    LANGUAGE_DETECTION_SPANS: int = config("LANGUAGE_DETECTION_SPANS", 3, cast=int)
+    LANGUAGE_DETECTION_SPAN_LENGTH: int = config("LANGUAGE_DETECTION_SPAN_LENGTH", 300, cast=int)
+    LANGUAGE_DETECTION_CACHE_SIZE: int = config("LANGUAGE_DETECTION_CACHE_SIZE", 4096, cast=int)
+
+    # Result cache settings
+    RESULT_CACHE_ENABLED: bool = config("RESULT_CACHE_ENABLED", True, cast=bool)
+    RESULT_CACHE_MAX_ENTRIES: int = config("RESULT_CACHE_MAX_ENTRIES", 1024, cast=int)
+    RESULT_CACHE_DISK_PATH: str = config("RESULT_CACHE_DISK_PATH", "")  # empty disables the disk tier
+    RESULT_CACHE_DISK_MAX_BYTES: int = config("RESULT_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024, cast=int)
+
+    # Result store settings
+    RESULT_STORE_PATH: str = config("RESULT_STORE_PATH", os.path.join(DATA_DIR, "results.sqlite3"))  # empty disables it
+
+    # Admission control settings
+    ADMISSION_MEMORY_BUDGET: int = config("ADMISSION_MEMORY_BUDGET", 1024 * 1024 * 1024, cast=int)  # 0 disables it
+    ADMISSION_MEMORY_MULTIPLIER: float = config("ADMISSION_MEMORY_MULTIPLIER", 4.0, cast=float)
+    ADMISSION_DEFAULT_ESTIMATE: int = config("ADMISSION_DEFAULT_ESTIMATE", 8 * 1024 * 1024, cast=int)
+    ADMISSION_HTTP_TIMEOUT: float = config("ADMISSION_HTTP_TIMEOUT", 2.0, cast=float)
+    ADMISSION_RETRY_AFTER: int = config("ADMISSION_RETRY_AFTER", 5, cast=int)
+
+    # Archive settings
+    ARCHIVE_MAX_ENTRIES: int = config("ARCHIVE_MAX_ENTRIES", 1000, cast=int)  # every member counts, documents or not
+    ARCHIVE_MAX_ENTRY_SIZE: int = config("ARCHIVE_MAX_ENTRY_SIZE", 64 * 1024 * 1024, cast=int)
+    ARCHIVE_MAX_TOTAL_SIZE: int = config("ARCHIVE_MAX_TOTAL_SIZE", 1024 * 1024 * 1024, cast=int)  # uncompressed
+    ARCHIVE_CONCURRENCY: int = config("ARCHIVE_CONCURRENCY", 8, cast=int)
+    ARCHIVE_MEMORY_BUDGET: int = config("ARCHIVE_MEMORY_BUDGET", 256 * 1024 * 1024, cast=int)  # per archive
+
+    # Batch endpoint settings
+    BATCH_MAX_ITEMS: int = config("BATCH_MAX_ITEMS", 5000, cast=int)
+    BATCH_MAX_CONCURRENCY: int = config("BATCH_MAX_CONCURRENCY", 8, cast=int)
+
+    # Async job settings
+    JOBS_QUEUE_SIZE: int = config("JOBS_QUEUE_SIZE", 1000, cast=int)
+    JOBS_WORKERS: int = config("JOBS_WORKERS", 8, cast=int)
+    JOBS_MAX_RETAINED: int = config("JOBS_MAX_RETAINED", 10000, cast=int)
+    JOBS_RETRY_AFTER: int = config("JOBS_RETRY_AFTER", 5, cast=int)
+
+    # Callback delivery settings
+    CALLBACK_HTTP2: bool = config("CALLBACK_HTTP2", False, cast=bool)
+    CALLBACK_TIMEOUT: float = config("CALLBACK_TIMEOUT", 10.0, cast=float)
+    CALLBACK_MAX_CONNECTIONS_PER_HOST: int = config("CALLBACK_MAX_CONNECTIONS_PER_HOST", 20, cast=int)
+    CALLBACK_KEEPALIVE_EXPIRY: float = config("CALLBACK_KEEPALIVE_EXPIRY", 30.0, cast=float)
+    CALLBACK_MAX_CLIENTS: int = config("CALLBACK_MAX_CLIENTS", 64, cast=int)  # per-origin clients, all hosts
+    CALLBACK_MAX_RETRIES: int = config("CALLBACK_MAX_RETRIES", 3, cast=int)
+    CALLBACK_BACKOFF_BASE: float = config("CALLBACK_BACKOFF_BASE", 0.5, cast=float)
+    CALLBACK_BACKOFF_MAX: float = config("CALLBACK_BACKOFF_MAX", 8.0, cast=float)
+    CALLBACK_OUTBOX_PATH: str = config(
+        "CALLBACK_OUTBOX_PATH", os.path.join(DATA_DIR, "callback_outbox.sqlite3")
+    )  # empty disables it
+    CALLBACK_OUTBOX_REPLAY_INTERVAL: float = config("CALLBACK_OUTBOX_REPLAY_INTERVAL", 30.0, cast=float)
+    CALLBACK_OUTBOX_LEASE: float = config("CALLBACK_OUTBOX_LEASE", 300.0, cast=float)  # longer than one delivery
+    CALLBACK_OUTBOX_MAX_ATTEMPTS: int = config("CALLBACK_OUTBOX_MAX_ATTEMPTS", 100, cast=int)  # 0 retries forever
+    CALLBACK_OUTBOX_MAX_AGE: float = config("CALLBACK_OUTBOX_MAX_AGE", 7 * 24 * 3600.0, cast=float)  # 0 keeps forever
 
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(ColorLogFormatter("%(levelname)s: %(message)s"))
-logging.basicConfig(level=logging.DEBUG, handlers=[console_handler])
-logger = logging.getLogger(__name__)
 
 settings = Settings()
+
+configure_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_COLOR)
+logger = logging.getLogger(__name__)
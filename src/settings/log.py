@@ -0,0 +1,121 @@
+import atexit
+import json
+import logging
+import platform
+import queue
+import sys
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from colorama import Fore, Style, init
+
+if platform.system() == "Windows":
+    init(autoreset=True)
+
+# Correlation ID of the job handled by the current task; asyncio tasks and `asyncio.to_thread` inherit it.
+correlation_id: ContextVar[str] = ContextVar("correlation_id", default="-")
+
+_listener: Optional[QueueListener] = None
+
+
+def set_correlation_id(value: str) -> None:
+    correlation_id.set(value)
+
+
+class ColorLogFormatter(logging.Formatter):
+    COLORS = {
+        logging.DEBUG: Fore.BLUE,
+        logging.INFO: Fore.GREEN,
+        logging.WARNING: Fore.LIGHTYELLOW_EX,
+        logging.ERROR: Fore.RED,
+        logging.CRITICAL: Fore.RED + Style.BRIGHT,
+    }
+
+    def format(self, record: logging.LogRecord) -> str:
+        color = self.COLORS.get(record.levelno, "")
+        message = super().format(record)
+        return f"{color}{message}{Style.RESET_ALL}"
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "correlation_id": getattr(record, "correlation_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class CorrelationIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread as they are. The stock `QueueHandler` formats the message in the calling
+    thread so records can be pickled; this queue never leaves the process, so formatting is left to the writer.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(level: str, log_format: str, color: str) -> None:
+    """
+    Routes all logging through an in-memory queue drained by a background writer thread,
+    so the event loop never blocks on stderr. Messages are formatted on the writer thread only.
+
+    :param level: Root log level, e.g. `INFO`.
+    :param log_format: `text` or `json`.
+    :param color: `auto` colors text output on TTYs only, `always` or `never` force it.
+    """
+
+    global _listener
+
+    if log_format == "json":
+        formatter = JsonLogFormatter()
+    elif color == "always" or (color == "auto" and sys.stderr.isatty()):
+        formatter = ColorLogFormatter("%(levelname)s: [%(correlation_id)s] %(message)s")
+    else:
+        formatter = logging.Formatter("%(asctime)s %(levelname)s: [%(correlation_id)s] %(message)s")
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(CorrelationIdFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flushes the queued records and stops the writer thread."""
+
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
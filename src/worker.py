@@ -0,0 +1,110 @@
+"""
+Standalone SQS worker, scaled independently of the web app.
+
+Usage: python -m src.worker [--processes N] [--concurrency M]
+
+Runs N consumer processes with up to M messages in flight each. On SIGTERM or SIGINT every process stops receiving,
+finishes its in-flight messages and releases the messages it has not started. Run the web app with
+`SQS_EMBEDDED_CONSUMER=False` when the queue is served by workers. With `METRICS_WORKER_PORT` set, process `i`
+serves its Prometheus metrics on port `METRICS_WORKER_PORT + i`.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import sys
+from typing import List
+
+from prometheus_client import start_http_server
+
+from src.app.aws.clients import sqs_client
+from src.app.aws.handlers import create_sqs_consumer, process_sqs_messages
+from src.app.services import get_callback_dispatcher, get_process_pool_engine, warm_up_services
+from src.settings.config import logger, settings
+
+RESTART_DELAY = 1.0
+
+
+async def run_consumer(concurrency: int, replay_outbox: bool) -> None:
+    await asyncio.to_thread(warm_up_services)
+
+    consumer = create_sqs_consumer(sqs_client, max_in_flight=concurrency)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, consumer.stop)
+
+    replay_task = asyncio.create_task(get_callback_dispatcher().run_outbox_replay()) if replay_outbox else None
+    try:
+        logger.info("Worker: Consuming with up to %s messages in flight", concurrency)
+        await process_sqs_messages(consumer)
+    finally:
+        if replay_task is not None:
+            replay_task.cancel()
+            await asyncio.gather(replay_task, return_exceptions=True)
+        await asyncio.to_thread(get_process_pool_engine().shutdown)
+        logger.info("Worker: Stopped")
+
+
+def consumer_process(concurrency: int, index: int) -> None:
+    if settings.METRICS_WORKER_PORT:
+        start_http_server(settings.METRICS_WORKER_PORT + index)
+
+    asyncio.run(run_consumer(concurrency, replay_outbox=index == 0))
+
+
+def supervise(processes: int, concurrency: int) -> int:
+    """
+    Runs the consumer processes, restarts the ones that die unexpectedly, and forwards SIGTERM/SIGINT to all of them.
+    Only the first process replays the callback outbox; entries are claimed before they are redelivered,
+    so it can share the outbox with the web application.
+    """
+
+    context = multiprocessing.get_context("spawn")
+    stopping = False
+
+    def start(index: int) -> multiprocessing.Process:
+        process = context.Process(
+            target=consumer_process, args=(concurrency, index), name=f"sqs-worker-{index}", daemon=False
+        )
+        process.start()
+        return process
+
+    def stop(signum, _frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+
+    workers: List[multiprocessing.Process] = [start(index) for index in range(processes)]
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while True:
+        for index, process in enumerate(workers):
+            process.join(timeout=RESTART_DELAY / processes)
+            if process.is_alive() or stopping:
+                continue
+            logger.error(f"Worker: {process.name} exited with code {process.exitcode}, restarting")
+            workers[index] = start(index)
+
+        if stopping and not any(process.is_alive() for process in workers):
+            return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Standalone SQS worker")
+    parser.add_argument("--processes", type=int, default=settings.WORKER_PROCESSES)
+    parser.add_argument("--concurrency", type=int, default=settings.SQS_MAX_IN_FLIGHT)
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        consumer_process(args.concurrency, index=0)
+        return 0
+
+    return supervise(args.processes, args.concurrency)
+
+
+if __name__ == "__main__":
+    sys.exit(main())